@@ -0,0 +1,67 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# statuses retried with exponential backoff, honouring Retry-After
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# statuses for which a POST is resent: SharePoint rejected it before processing it, so resending can not
+# create an item twice, unlike after a gateway 5xx
+POST_RETRY_STATUSES = (429, 503)
+
+class SharePointRetry(Retry):
+    """
+    A `Retry` that resends POST requests, such as `$batch` requests, only when SharePoint throttled them.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        """
+        Tells whether a response is retried. POST requests are only retried on `POST_RETRY_STATUSES`.
+
+        Args:
+            method (str): The HTTP method of the request.
+            status_code (int): The status code of the response.
+            has_retry_after (bool, optional): Whether the response has a `Retry-After` header.
+
+        Returns:
+            bool: True if the request is sent again.
+        """
+
+        if method.upper() == 'POST' and status_code not in POST_RETRY_STATUSES:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+def mount_retry_adapter(session, pool_connections=4, pool_maxsize=32) -> requests.Session:
+    """
+    Mounts a pooled, retrying `HTTPAdapter` on a session for both https:// and http:// sites.
+
+    Args:
+        session (requests.Session): The session to configure.
+        pool_connections (int, optional): The number of connection pools kept, one per host (default is 4).
+        pool_maxsize (int, optional): The number of connections kept open per host (default is 32).
+
+    Returns:
+        requests.Session: The same session, for chaining.
+
+    Actions:
+        - Reuses open keep-alive connections instead of performing a new TCP/TLS handshake per request.
+        - Retries GET requests on `RETRY_STATUSES` and POST requests on `POST_RETRY_STATUSES`, up to 5 times with
+          exponential backoff. `requests.exceptions.RetryError` is raised once the attempts are exhausted.
+    """
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=False,
+        max_retries=SharePointRetry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=['GET', 'POST']
+        )
+    )
+    # on-premises sites are often served over plain http
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
@@ -1,4 +1,5 @@
 import requests
+from connector.http_adapter import mount_retry_adapter
 from logger.custom_logger import get_logger
 
 class SharePointConnector:
@@ -43,12 +44,14 @@ class SharePointConnector:
 
         If `cookie_dict` is provided, it sets cookies in the session for authentication.
         If `auth_token` is provided, it adds the token to the session headers for authentication.
+        A pooled `HTTPAdapter` is mounted so that requests to the site reuse open keep-alive connections instead of performing a new TCP/TLS handshake,
+        and transient failures (throttling and 5xx responses) are retried with exponential backoff, see `mount_retry_adapter`.
 
         Returns:
             requests.Session: The configured HTTP session for SharePoint requests.
         """
 
-        session = requests.Session()
+        session = mount_retry_adapter(requests.Session())
 
         if self.cookie_dict:
             for name, value in self.cookie_dict.items():
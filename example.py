@@ -58,11 +58,14 @@ def main():
         )
     )
 
-    list_items = List(
-        site_url=connector_obj.site_url,
-        list_name=list_name,
-        sharepoint_connector_object=connector_obj,
-    ).get_list_items()
+    try:
+        list_items = List(
+            site_url=connector_obj.site_url,
+            list_name=list_name,
+            sharepoint_connector_object=connector_obj,
+        ).get_list_items()
+    finally:
+        connector_obj.session.close()
 
     print(list_items)
 
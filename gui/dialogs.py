@@ -1,5 +1,5 @@
 import customtkinter as ctk
-from utils.tools import write_config, set_mappings, get_mappings
+from utils.tools import write_config, set_mappings, get_mappings, store_mappings
 
 class InputDialog(ctk.CTkToplevel):
     def __init__(self, master, prompt, title):
@@ -250,7 +250,7 @@ class MappingViewer(ctk.CTkToplevel):
         for (section, list_col), entry in self.entries.items():
             new_mapping_str = entry.get()
             new_mappings = [mapping.strip() for mapping in new_mapping_str.split(",")]
-            self.config.set(section, list_col, str(new_mappings))
+            store_mappings(self.config, section, list_col, new_mappings)
         
         write_config(self.config, self.file_path)
         self.destroy()
@@ -0,0 +1,12 @@
+class ListNotFoundError(RuntimeError):
+
+    """
+    Raised when SharePoint answers 404 for a list, usually because the list name is wrong or the list was deleted.
+
+    Attributes:
+        - list_name (str): The name of the list that could not be found.
+    """
+
+    def __init__(self, list_name: str):
+        self.list_name = list_name
+        super().__init__(f"List '{list_name}' not found! Please double check your list name.")
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
+# largest page SharePoint returns for a single items request, also the width of the Id ranges read in parallel
+MAX_PAGE_SIZE = 5000
+
+def get_items_by_id_range(max_id: int, fetch_range, max_workers: int) -> list:
+
+    """
+    Retrieves every item of a list up to `max_id` by fetching `Id` ranges of `MAX_PAGE_SIZE` in parallel.
+
+    Parameters:
+        - max_id (int): The highest `Id` of the list.
+        - fetch_range (callable): A function taking the bounds `(lower, upper)` of a range and returning the items with `lower < Id <= upper`.
+        - max_workers (int): The maximum number of ranges fetched at the same time.
+
+    Returns:
+        - list: All the items of the ranges, ordered by `Id`.
+
+    Notes:
+        - SharePoint ignores `$skip` on list items, and only returns the link to the next page along with the current one, so the list is partitioned on `Id` instead. Each range holds at most one page of items, and at most `MAX_PAGE_SIZE` items are scanned by its request, keeping it under the list view threshold.
+    """
+
+    ranges = [(lower, lower + MAX_PAGE_SIZE) for lower in range(0, max_id, MAX_PAGE_SIZE)]
+    all_items = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for page in executor.map(lambda bounds: fetch_range(*bounds), ranges):
+            all_items.extend(page)
+
+    return all_items
@@ -0,0 +1,51 @@
+import time
+
+# (site_url, list_name) -> {"expires_at": ..., "<metadata name>": ...}, shared by BaseList and ListOperations
+_META_CACHE: dict[tuple[str, str], dict] = {}
+META_CACHE_TTL = 600
+
+def get_cached_metadata(site_url: str, list_name: str, name: str, loader) -> object:
+
+    """
+    Returns the list metadata stored under `name` for a site and list, calling `loader()` to fetch it when it is missing or older than `META_CACHE_TTL` seconds.
+
+    Parameters:
+        - site_url (str): The base URL of the SharePoint site.
+        - list_name (str): The name of the SharePoint list.
+        - name (str): The name under which the metadata is cached, e.g. "fields" or "list_properties".
+        - loader (callable): A function that fetches the metadata from SharePoint.
+
+    Returns:
+        - object: The cached or freshly loaded metadata.
+
+    Notes:
+        - Every metadata of a list expires at the same time, so columns added or renamed on the server are seen within `META_CACHE_TTL` seconds.
+    """
+
+    cache_key = (site_url, list_name)
+    now = time.monotonic()
+    entry = _META_CACHE.get(cache_key)
+    if entry is None or entry["expires_at"] <= now:
+        entry = {"expires_at": now + META_CACHE_TTL}
+        _META_CACHE[cache_key] = entry
+    if name not in entry:
+        entry[name] = loader()
+
+    return entry[name]
+
+def invalidate_metadata_cache(site_url: str = None, list_name: str = None) -> None:
+
+    """
+    Drops the cached metadata, so that it is fetched again from SharePoint on next use.
+
+    Parameters:
+        - site_url (str, optional): Only drop the metadata of this site. Defaults to every site.
+        - list_name (str, optional): Only drop the metadata of this list. Defaults to every list.
+    """
+
+    for cached_site_url, cached_list_name in list(_META_CACHE):
+        if site_url not in (None, cached_site_url):
+            continue
+        if list_name not in (None, cached_list_name):
+            continue
+        _META_CACHE.pop((cached_site_url, cached_list_name), None)
@@ -1,5 +1,14 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from logger.custom_logger import get_logger
+from utils.serialization import json_loads
+
+# bytes written to disk at a time when downloading an attachment
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# attachments of an item downloaded at the same time
+DOWNLOAD_WORKERS = 8
 
 class SharePointOperations:
 
@@ -10,7 +19,7 @@ class SharePointOperations:
         1. get_attachments(site_url: str, source_name: str, item_id: int, session: requests.Session) -> list
         - Retrieves the list of attachments for a specified item in a SharePoint list.
         
-        2. download_attachments(site_url: str, source_name: str, item_id: int, attachment_name_list: list, session: requests.Session, download_location: str) -> None
+        2. download_attachments(site_url: str, source_name: str, item_id: int, attachment_name_list: list, session: requests.Session, download_location: str, max_workers: int = DOWNLOAD_WORKERS) -> None
         - Downloads the specified attachments from a SharePoint list item and saves them to the given download location on the local system.
         
         3. upload_attachments(site_url: str, source_name: str, item_id: int, attachment_list: list, digest_value: str, session: requests.Session) -> None
@@ -93,7 +102,7 @@ class SharePointOperations:
         response = session.get(endpoint, headers=headers)
         response.raise_for_status()
 
-        data = response.json()
+        data = json_loads(response.content)
         attachments = data.get("d", {}).get("results", [])
         for attachemnt in attachments:
             filename = attachemnt["FileName"]
@@ -109,6 +118,7 @@ class SharePointOperations:
         attachment_name_list: list,
         session: requests.Session,
         download_location: str,
+        max_workers: int = DOWNLOAD_WORKERS,
     ) -> None:
         
         """
@@ -122,6 +132,7 @@ class SharePointOperations:
             - attachment_name_list (list): A list of attachment file names that need to be downloaded.
             - session (requests.Session): An authenticated session object used to make requests to SharePoint. This session should have proper authorization to access the specified list.
             - download_location (str): The path where the attachments will be saved locally.
+            - max_workers (int, optional): The maximum number of attachments downloaded at the same time, default is `DOWNLOAD_WORKERS`.
 
         Returns:
             - None: This method doesn't return anything. It downloads the specified attachments and saves them to the specified location.
@@ -141,20 +152,32 @@ class SharePointOperations:
             - Ensure the session object has valid authentication and necessary permissions to access and download the attachments.
             - Make sure that the download location path exists and is writable.
             - Only the attachments specified in `attachment_name_list` will be downloaded.
+            - Attachments are streamed to disk `DOWNLOAD_CHUNK_SIZE` bytes at a time, so large files are never held in memory as a whole.
+            - Attachments are downloaded `max_workers` at a time; the first failed download is raised once the others are done.
+            - Attachments are requested uncompressed (`Accept-Encoding: identity`), since they are mostly already compressed files (PDFs, images, Office documents) that gzip would not shrink.
         """
 
 
-        headers = {"Accept": "application/json; odata=verbose"}
+        # the file content is written as sent, no gzip round trip on either side
+        headers = {"Accept": "application/json; odata=verbose", "Accept-Encoding": "identity"}
 
-        for filename in attachment_name_list:
+        def download(filename):
             endpoint = f"{site_url}_api/web/lists/getbytitle('{source_name}')/Items({item_id})/AttachmentFiles('{filename}')/$value"
-            response = session.get(endpoint, headers=headers)
-            response.raise_for_status()
-            if response.status_code == 200:
-                with open(f"{download_location}\\{filename}", "wb") as f:
-                    f.write(response.content)
-            else:
-                SharePointOperations.logger.error('Something went wrong! %s', response.json())
+            with session.get(endpoint, headers=headers, stream=True) as response:
+                response.raise_for_status()
+                with open(os.path.join(download_location, filename), "wb") as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+
+        if len(attachment_name_list) <= 1:
+            for filename in attachment_name_list:
+                download(filename)
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(download, filename) for filename in attachment_name_list]
+        for future in futures:
+            future.result()
 
     @staticmethod
     def upload_attachments(
@@ -197,6 +220,7 @@ class SharePointOperations:
             - The `digest_value` is necessary to authenticate POST requests to SharePoint, and should be obtained from a valid SharePoint session.
             - Only files specified in `attachment_list` will be uploaded to the SharePoint list item.
             - The file paths in `attachment_list` should be accessible and valid on the local system.
+            - The attachments of an item are uploaded one after the other, since concurrent additions to the same item conflict on its version. Items are uploaded concurrently by `List` instead.
         """
 
         request_digest = digest_value
@@ -1,7 +1,83 @@
+import re
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property, lru_cache
+from typing import Iterator
+from urllib.parse import quote
+import pandas as pd
+import requests
 from logger.custom_logger import get_logger
+from utils.serialization import json_dumps, json_loads
 from connector.sharepoint_connector import SharePointConnector
 from sharepoint.common.sharepoint_operations import SharePointOperations
+from sharepoint.common.exceptions import ListNotFoundError
+from sharepoint.common.id_ranges import MAX_PAGE_SIZE, get_items_by_id_range
+from sharepoint.common.metadata_cache import get_cached_metadata, invalidate_metadata_cache
+
+# status line, headers and body of each operation inside a $batch response
+BATCH_RESPONSE_PATTERN = re.compile(
+    r"HTTP/1\.1 (?P<status>\d{3})[^\r\n]*\r?\n(?:[^\r\n]+\r?\n)*\r?\n(?P<body>.*?)(?=\r?\n--)",
+    re.S,
+)
+
+# lines shared by every operation of a $batch changeset
+BATCH_PART_HEADERS = ("Content-Type: application/http", "Content-Transfer-Encoding: binary", "")
+BATCH_ACCEPT_HEADER = "Accept: application/json;odata=verbose"
+BATCH_CONTENT_TYPE_HEADER = "Content-Type: application/json;odata=verbose"
+
+# headers sent with every request of a list, rather than set on the session shared with the rest of the connector
+VERBOSE_HEADERS = {
+    "Accept": "application/json;odata=verbose",
+    "Content-Type": "application/json;odata=verbose",
+}
+
+# reads don't need the verbose __metadata/__deferred envelopes, only writes rely on __metadata.type
+READ_HEADERS = {"Accept": "application/json;odata=nometadata"}
+
+# item keys that are never written back to SharePoint
+_SKIP_KEYS: frozenset[str] = frozenset({"Id", "Attachment List", "Modified"})
+
+# attachment uploads running at the same time while items are written
+ATTACHMENT_WORKERS = 8
+
+# fields always requested along with the list columns when no explicit $select is given
+DEFAULT_SELECT_FIELDS = ("Id", "Modified", "Attachments")
+
+@lru_cache(maxsize=32)
+def _build_items_url(items_url: str, query, select: tuple[str, ...], top: int = MAX_PAGE_SIZE) -> str:
+
+    """
+    Builds the URL of the first page of an items query, adding the `$select`, `$expand` and `$top` options unless the query already sets them.
+
+    Parameters:
+        - items_url (str): The items endpoint of the list.
+        - query (str | None): The query string provided by the caller, starting with `?`.
+        - select (tuple[str, ...]): The internal names of the fields to retrieve. Fields of a related item (e.g. `Author/Title`) add the matching `$expand`.
+        - top (int, optional): The page size requested, default is `MAX_PAGE_SIZE`.
+
+    Returns:
+        - str: The URL of the first page.
+
+    Notes:
+        - The URLs are cached, since the same few queries are built again for every `Id` range and every read of a list.
+    """
+
+    options = []
+    query = query or ""
+    if "$select=" not in query:
+        options.append(f"$select={','.join(select)}")
+        expand = sorted({field.split("/")[0] for field in select if "/" in field})
+        if expand and "$expand=" not in query:
+            options.append(f"$expand={','.join(expand)}")
+    if "$top=" not in query:
+        options.append(f"$top={top}")
+    if not options:
+        return items_url + query
+
+    separator = "&" if query else "?"
+    return items_url + query + separator + "&".join(options)
+
 
 class BaseList:
     """
@@ -18,10 +94,18 @@ class BaseList:
         - logger: A logger instance for logging information and errors.
 
     Methods:
-        - get_list_items(query=None) -> list
+        - _request(method, url, **kwargs) -> requests.Response
+        - _get_json(endpoint) -> dict
+        - get_list_items(query=None, fields=None, max_workers=8) -> list
+        - iter_list_items(query=None, fields=None) -> Iterator[dict]
         - get_list_property(property_name) -> str
         - get_required_columns() -> dict[dict]
+        - _get_fields_cached() -> list[dict]
+        - _get_list_properties_cached() -> dict
+        - _invalidate_metadata_cache() -> None
         - __get_column_datatypes() -> dict
+        - __get_all_items_concurrently(fields, max_workers) -> list
+        - __strip_odata_metadata(item) -> dict
     """
 
     def __init__(
@@ -44,69 +128,234 @@ class BaseList:
             - `session`: The authenticated session object retrieved from the `SharePointConnector`.
             - `digest_value`: The form digest value for authenticated SharePoint requests.
             - `list_item_dtype_property_name`: Set to "ListItemEntityTypeFullName", used to retrieve list item data type.
-            - `list_data_type`: The data type of the list items retrieved by the `get_list_property` method.
-            - `column_datatypes`: A dictionary containing the internal names and data types for the list's columns.
+            - `_list_url` / `_items_url` / `_fields_url` / `_batch_url`: The list, list items, visible fields and `$batch` endpoints, built once with the list name safely quoted.
             - `logger`: An instance of the logger for logging.
+
+        `list_data_type` and `column_datatypes` are not fetched here; they are loaded from SharePoint on first access.
         """
 
+        self.logger = get_logger(self.__class__.__name__)
         self.site_url = site_url
         self.list_name = list_name
         self.session = sharepoint_connector_object.session
         self.digest_value = sharepoint_connector_object.digest_value
         self.list_item_dtype_property_name = "ListItemEntityTypeFullName"
-        self.list_data_type = self.get_list_property(self.list_item_dtype_property_name)
-        self.column_datatypes = self.__get_column_datatypes()
-        self.logger = get_logger(self.__class__.__name__)
+        # list titles are OData string literals, so quotes are doubled before URL-encoding
+        list_name_quoted = quote(list_name.replace("'", "''"), safe="")
+        self._list_url = f"{site_url}_api/web/lists/getbytitle('{list_name_quoted}')"
+        self._items_url = self._list_url + "/items"
+        self._fields_url = self._list_url + "/fields?$filter=Hidden eq false and ReadOnlyField eq false"
+        self._batch_url = site_url + "_api/$batch"
+
+    @cached_property
+    def list_data_type(self) -> str:
+
+        """
+        The data type of the list items, fetched on first access and cached for the lifetime of the instance.
+        """
+
+        return self.get_list_property(self.list_item_dtype_property_name)
 
-    def get_list_items(self, query=None) -> list:
+    @cached_property
+    def column_datatypes(self) -> dict:
+
+        """
+        The internal names and data types of the list's columns, fetched on first access and cached for the lifetime of the instance.
+        """
+
+        return self.__get_column_datatypes()
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+
+        """
+        Sends a request through the authenticated session, pacing the next request when SharePoint reports that its rate limit is almost reached.
+
+        Parameters:
+            - method (str): The HTTP method of the request.
+            - url (str): The URL of the request.
+            - **kwargs: Any other argument accepted by `requests.Session.request`. The given `headers` are sent on top of `VERBOSE_HEADERS`.
+
+        Returns:
+            - requests.Response: The response of the request.
+
+        Notes:
+            - The OData headers are passed with the request, so the session shared with the connector keeps its own defaults.
+            - Throttled (429/503) responses are retried by the retry adapter that `SharePointConnector` mounts on the session, honouring `Retry-After`. Once its attempts are exhausted it raises `requests.exceptions.RetryError`.
+            - When the `RateLimit-Remaining` header reports that fewer than 10 requests are left in the current window, the next request is delayed by `60 / RateLimit-Limit` seconds.
+        """
+
+        kwargs["headers"] = {**VERBOSE_HEADERS, **(kwargs.get("headers") or {})}
+        response = self.session.request(method, url, **kwargs)
+
+        remaining = response.headers.get("RateLimit-Remaining")
+        limit = response.headers.get("RateLimit-Limit")
+        if remaining and limit and remaining.isdigit() and limit.isdigit() and int(remaining) < 10:
+            time.sleep(max(0, 60 / int(limit)))
+
+        return response
+
+    def _get_json(self, endpoint: str) -> dict:
+
+        """
+        Sends a read request to SharePoint and returns its parsed JSON body.
+
+        Parameters:
+            - endpoint (str): The URL to read.
+
+        Returns:
+            - dict: The parsed response.
+
+        Notes:
+            - A 404 response raises `ListNotFoundError` instead of a generic HTTP error, other error statuses raise `requests.HTTPError`.
+        """
+
+        response = self._request("GET", endpoint, headers=READ_HEADERS)
+        if response.status_code == 404:
+            self.logger.critical("List not found! Please double check your list name.")
+            raise ListNotFoundError(self.list_name)
+        response.raise_for_status()
+
+        return json_loads(response.content)
+
+    def get_list_items(self, query=None, fields=None, max_workers=8) -> list:
 
         """
         Retrieves the items from the SharePoint list. Optionally, a query can be provided to filter the items.
 
         Parameters:
             - query (optional): A query string used to filter the list items (e.g., CAML or OData queries).
+            - fields (list[str], optional): The internal names of the fields to retrieve. Defaults to `Id`, `Modified`, `Attachments` and every column of the list.
+            - max_workers (int, optional): The number of pages fetched concurrently when no query is provided, default is 8.
 
         Returns:
             - list: A list of SharePoint list items, optionally filtered by the query.
 
         Notes:
-            - The returned list items may contain metadata and actual data from the SharePoint list.
-            - If no query is provided, all list items will be retrieved.
+            - The OData `__metadata` entry and deferred navigation properties are stripped from each item to keep large reads small in memory.
+            - If no query is provided, all list items will be retrieved. The list is then split into `Id` ranges of `MAX_PAGE_SIZE` which are fetched concurrently, see `get_items_by_id_range`, and the items are returned in `Id` order.
+            - When a query is provided, pages are fetched one after the other by following SharePoint's `__next` links.
+            - Use `iter_list_items` instead when the items only need to be iterated once, to avoid holding the whole list in memory.
+            - Only the selected fields are sent back by SharePoint, see `iter_list_items` for how lookup fields are handled.
         """
 
-        endpoint = (
-            f"{self.site_url}_api/web/lists/getbytitle('{self.list_name}')/items"
-        )
         if query:
-            endpoint += query
-        headers = {
-            "Accept": "application/json;odata=verbose",
-            "Content-Type": "application/json;odata=verbose",
-        }
-
-        all_items = []
-        while endpoint:
-            response = self.session.get(endpoint, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if response.status_code == 200:
-                items = data.get("d", {}).get("results", [])
-                all_items.extend(items)
-
-                endpoint = data.get("d", {}).get("__next", None)
-            elif response.status_code == 404:
-                self.logger.critical(
-                    "List not found! Please double check your list name."
-                )
-                exit()
-            else:
-                self.logger.critical("Something went wrong!")
-            time.sleep(2)
+            all_items = list(self.iter_list_items(query, fields))
+        else:
+            all_items = self.__get_all_items_concurrently(fields, max_workers)
         items_retrieved = len(all_items)
         self.logger.success("Total %s items retrieved from the List", items_retrieved)
 
         return all_items
 
+    def __get_all_items_concurrently(self, fields, max_workers: int) -> list:
+
+        """
+        A private method that retrieves every item of the SharePoint list by fetching `Id` ranges in parallel.
+
+        Parameters:
+            - fields (list[str] | None): The internal names of the fields to retrieve, see `iter_list_items`.
+            - max_workers (int): The maximum number of ranges fetched at the same time.
+
+        Returns:
+            - list: All the list items, ordered by `Id`.
+
+        Notes:
+            - SharePoint ignores `$skip` on list items, so the list is partitioned on `Id` by `get_items_by_id_range` instead: each range `(lower, lower + MAX_PAGE_SIZE]` holds at most one page of items.
+            - Throttled requests (429/503) are retried by the session's retry adapter, honouring `Retry-After`.
+        """
+
+        # only the first page is read, SharePoint still returns a next link with $top=1
+        last_item = next(self.iter_list_items("?$orderby=Id desc&$top=1", fields=["Id"]), None)
+        if last_item is None:
+            return []
+        max_id = last_item["Id"]
+
+        return get_items_by_id_range(
+            max_id,
+            lambda lower, upper: list(self.iter_list_items(f"?$filter=Id gt {lower} and Id le {upper}&$top={MAX_PAGE_SIZE}", fields)),
+            max_workers,
+        )
+
+    def iter_list_items(self, query=None, fields=None) -> Iterator[dict]:
+
+        """
+        Lazily retrieves the items from the SharePoint list, one page at a time. Optionally, a query can be provided to filter the items.
+
+        Parameters:
+            - query (optional): A query string used to filter the list items (e.g., CAML or OData queries).
+            - fields (list[str], optional): The internal names of the fields to retrieve. Defaults to `Id`, `Modified`, `Attachments` and every column of the list.
+
+        Yields:
+            - dict: A SharePoint list item, as soon as the page containing it has been fetched.
+
+        Notes:
+            - Items are requested with `odata=nometadata`, which keeps pages several times smaller than `odata=verbose`.
+            - Only one page of items is held in memory at a time, and the next page is not requested until the current one has been consumed.
+            - Lookup and person columns are selected by their `<Name>Id` value by default, which needs no `$expand`. Fields of a related item (e.g. `Author/Title`) can be passed in `fields`, the matching `$expand` is then added automatically.
+            - `$select` and `$top` are left untouched when the query already sets them.
+            - A `ListNotFoundError` is raised if SharePoint does not find the list.
+        """
+
+        # built once; the following pages are requested with the next link returned by SharePoint
+        endpoint = _build_items_url(self._items_url, query, self.__select_fields(fields))
+
+        while endpoint:
+            data = self._get_json(endpoint)
+            try:
+                items = data["value"]
+                endpoint = data.get("odata.nextLink")
+            except KeyError:
+                # odata=verbose response
+                items = data["d"]["results"]
+                endpoint = data["d"].get("__next")
+            # drop the parsed page before handing out its items
+            del data
+            for item in items:
+                yield self.__strip_odata_metadata(item)
+            del items
+
+    def __select_fields(self, fields) -> tuple[str, ...]:
+
+        """
+        A private method that returns the fields to `$select`: the given ones, or `DEFAULT_SELECT_FIELDS` followed by every column of the list.
+
+        Parameters:
+            - fields (list[str] | None): The internal names of the fields requested by the caller.
+
+        Returns:
+            - tuple[str, ...]: The internal names of the fields to retrieve.
+        """
+
+        if fields is not None:
+            return tuple(fields)
+
+        select = list(DEFAULT_SELECT_FIELDS)
+        for column in self.get_required_columns().values():
+            if column and column["Internal Name"] not in select:
+                select.append(column["Internal Name"])
+
+        return tuple(select)
+
+    @staticmethod
+    def __strip_odata_metadata(item: dict) -> dict:
+
+        """
+        A private method that removes the OData `__metadata` entry and the unexpanded `__deferred` navigation properties from a list item.
+
+        Parameters:
+            - item (dict): A list item as returned by SharePoint with `odata=verbose`.
+
+        Returns:
+            - dict: The same item containing only its field values.
+        """
+
+        return {
+            key: value
+            for key, value in item.items()
+            if key != "__metadata"
+            and not (isinstance(value, dict) and "__deferred" in value)
+        }
+
     def get_list_property(self, property_name) -> str:
 
         """
@@ -123,20 +372,62 @@ class BaseList:
               `get_list_property("ListItemEntityTypeFullName")`.
         """
 
-        endpoint = f"{self.site_url}_api/web/lists/getbytitle('{self.list_name}')"
-        headers = {
-            "Accept": "application/json;odata=verbose",
-            "Content-Type": "application/json;odata=verbose",
-        }
-
-        response = self.session.get(endpoint, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        output = data.get("d", {}).get(property_name, None)
-        time.sleep(0.5)
+        output = self._get_list_properties_cached().get(property_name, None)
 
         return output
 
+    def _get_cached_metadata(self, name: str, loader) -> object:
+
+        """
+        Returns the list metadata stored under `name` in the metadata cache shared by every instance (and by `ListOperations`) pointing at the same site and list, calling `loader()` to fetch it when it is missing or older than `META_CACHE_TTL` seconds.
+
+        Parameters:
+            - name (str): The name under which the metadata is cached.
+            - loader (callable): A function that fetches the metadata from SharePoint.
+
+        Returns:
+            - object: The cached or freshly loaded metadata.
+        """
+
+        return get_cached_metadata(self.site_url, self.list_name, name, loader)
+
+    def _invalidate_metadata_cache(self) -> None:
+
+        """
+        Drops the cached metadata of the list, both from the shared module-level cache and from this instance, so that it is fetched again on next use.
+        """
+
+        invalidate_metadata_cache(self.site_url, self.list_name)
+        for name in ("list_data_type", "column_datatypes", "column_name_mappings", "_primary_internal_name"):
+            self.__dict__.pop(name, None)
+
+    def _get_list_properties_cached(self) -> dict:
+
+        """
+        Returns the properties of the SharePoint list, fetching them with a single GET request the first time they are needed.
+        """
+
+        def load_list_properties():
+            data = self._get_json(self._list_url)
+            return data.get("d", data)
+
+        return self._get_cached_metadata("list_properties", load_list_properties)
+
+    def _get_fields_cached(self) -> list[dict]:
+
+        """
+        Returns the raw field definitions of the visible, writable columns of the SharePoint list, fetching them with a single GET request the first time they are needed.
+        """
+
+        def load_fields():
+            data = self._get_json(self._fields_url)
+            try:
+                return data["value"]
+            except KeyError:
+                return data["d"]["results"]
+
+        return self._get_cached_metadata("fields", load_fields)
+
     def get_required_columns(self) -> dict[dict]:
 
         """
@@ -166,25 +457,7 @@ class BaseList:
 
         required_cols = {}
         required_cols["Id"] = {}
-
-        headers = {"Accept": "application/json; odata=verbose"}
-        endpoint = f"{self.site_url}_api/web/lists/getbytitle('{self.list_name}')/fields?$filter=Hidden eq false and ReadOnlyField eq false"
-
-        response = self.session.get(endpoint, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        columns_info = data.get("d", {}).get("results", [])
-        for column in columns_info:
-            title = column["Title"]
-            internal_name = column["EntityPropertyName"]
-            data_type = column["TypeAsString"]
-            if column["FieldTypeKind"] in [20, 7]:
-                internal_name += "Id"
-            if internal_name not in ["ContentType"]:
-                required_cols[title] = {
-                    "Internal Name": internal_name,
-                    "Data Type": data_type,
-                }
+        required_cols.update(self.__build_column_info(lookup_ids=True))
 
         return required_cols
 
@@ -210,33 +483,38 @@ class BaseList:
         }
         ```
         Notes:
-            - This method is automatically called during the initialization of the `BaseList` class.
+            - This method is called the first time `column_datatypes` is accessed.
             - It is a private method and is not intended to be called directly.
         """
 
-        required_cols = {}
+        return self.__build_column_info(lookup_ids=False)
 
-        headers = {"Accept": "application/json; odata=verbose"}
-        endpoint = f"{self.site_url}_api/web/lists/getbytitle('{self.list_name}')/fields?$filter=Hidden eq false and ReadOnlyField eq false"
+    def __build_column_info(self, lookup_ids: bool) -> dict:
 
-        response = self.session.get(endpoint, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        columns_info = data.get("d", {}).get("results", [])
-        for column in columns_info:
-            title = column["Title"]
+        """
+        A private method that builds the internal name and data type of every column from the cached field definitions of the list.
+
+        Parameters:
+            - lookup_ids (bool): Whether lookup columns are named by their `<Name>Id` value like person columns, instead of by their own name.
+
+        Returns:
+            - dict: A dictionary with column titles as keys, and the values being a dictionary containing the internal name and data type of each column.
+        """
+
+        id_field_kinds = (20, 7) if lookup_ids else (20,)
+        column_info = {}
+
+        for column in self._get_fields_cached():
             internal_name = column["EntityPropertyName"]
-            data_type = column["TypeAsString"]
-            if column["FieldTypeKind"] == 20:
+            if column["FieldTypeKind"] in id_field_kinds:
                 internal_name += "Id"
-            if internal_name not in ["ContentType"]:
-                required_cols[title] = {
+            if internal_name != "ContentType":
+                column_info[column["Title"]] = {
                     "Internal Name": internal_name,
-                    "Data Type": data_type,
+                    "Data Type": column["TypeAsString"],
                 }
-        time.sleep(0.5)
 
-        return required_cols
+        return column_info
 
 
 class List(BaseList):
@@ -249,6 +527,7 @@ class List(BaseList):
         - list_name (str): The name of the SharePoint list.
         - primary_column (str): The primary column used to identify list items, default is 'Title'.
         - batch_size (int): The size of the batch for insert, update, and delete operations.
+        - max_concurrency (int): The number of `$batch` requests sent to SharePoint at the same time.
         - column_name_mappings (dict): A dictionary mapping the internal column names to their display names.
         - session (requests.Session): An authenticated session for interacting with SharePoint.
         - digest_value (str): The form digest value required for authenticated SharePoint operations.
@@ -263,7 +542,7 @@ class List(BaseList):
         - __get_column_name_mappings() -> dict
     """
 
-    def __init__(self, site_url: str, list_name: str, sharepoint_connector_object: SharePointConnector, primary_column='Title', batch_size=50):
+    def __init__(self, site_url: str, list_name: str, sharepoint_connector_object: SharePointConnector, primary_column='Title', batch_size=50, max_concurrency=4):
         
         """
         Initializes the `List` class with additional features for handling complex operations on SharePoint lists.
@@ -274,6 +553,7 @@ class List(BaseList):
             - sharepoint_connector_object (SharePointConnector): An instance of `SharePointConnector` providing session and digest value.
             - primary_column (str, optional): The primary column used to identify list items, default is 'Title'.
             - batch_size (int, optional): The batch size for insert, update, and delete operations, default is 50.
+            - max_concurrency (int, optional): The number of `$batch` requests sent at the same time by insert, update, and delete operations, default is 4.
 
         This constructor initializes the following:
             - `site_url`: The SharePoint site URL.
@@ -282,13 +562,33 @@ class List(BaseList):
             - `digest_value`: The form digest value for authenticated SharePoint requests.
             - `primary_column`: The primary column used to identify list items.
             - `batch_size`: The size of batches for insert, update, and delete operations.
-            - `column_name_mappings`: A dictionary containing internal and display name mappings for the list columns.
+            - `max_concurrency`: The number of batches sent concurrently.
+
+        `column_name_mappings` is loaded from SharePoint on first access.
         """
         
         super().__init__(site_url, list_name, sharepoint_connector_object)
-        self.column_name_mappings = self.__get_column_name_mappings()
         self.primary_column = primary_column
         self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    @cached_property
+    def column_name_mappings(self) -> dict:
+
+        """
+        The display name to internal name mappings of the list's columns, fetched on first access and cached for the lifetime of the instance.
+        """
+
+        return self.__get_column_name_mappings()
+
+    @cached_property
+    def _primary_internal_name(self) -> str:
+
+        """
+        The internal name of `primary_column`, used to identify items in the write logs. Resolved once from the cached list fields.
+        """
+
+        return self.get_required_columns()[self.primary_column]["Internal Name"]
 
     def __get_column_name_mappings(self) -> dict:
         
@@ -312,19 +612,8 @@ class List(BaseList):
             - It maps the internal column names to their respective display names for easier reference.
         """
         
-        endpoint = f"{self.site_url}_api/web/lists/getbytitle('{self.list_name}')/fields?$filter=Hidden eq false and ReadOnlyField eq false"
-        headers = {
-            "Accept": "application/json;odata=verbose",
-            "Content-Type": "application/json;odata=verbose",
-        }
-
-        response = self.session.get(endpoint, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-
-        fields = data.get("d", {}).get("results", [])
+        fields = self._get_fields_cached()
         field_mappings = {field["Title"]: field["InternalName"] for field in fields}
-        time.sleep(0.5)
         return field_mappings
 
     def prepare_data(self, insert_list: list) -> list:
@@ -352,37 +641,38 @@ class List(BaseList):
             ]
             ```
         Notes:
-            - This method uses `column_name_mappings` to ensure the data is structured correctly before being inserted.
+            - This method uses `column_datatypes` to ensure the data is structured correctly before being inserted.
+            - Text and Number columns are coerced column-wise with pandas; values that are missing or cannot be converted to a number are dropped from the item.
         """
         
-        processed_insert_list = []
-        for item in insert_list:
-            processed_item_dict = {}
-            for key, value in item.items():
-                data_type = self.list_field_dict[key]["Data Type"]
-                internal_name = self.list_field_dict[key]["Internal Name"]
-
-                if data_type == "Text":
-                    if not isinstance(value, str):
-                        value = str(value)
-                elif data_type == "Number":
-                    if not isinstance(value, int) or not isinstance(value, float):
-                        try:
-                            value = float(value)
-                        except ValueError:
-                            value = None
-                elif data_type == "DateTime":
-                    pass
-                elif data_type == "Choice":
-                    pass
-                elif data_type == "Attachments":
-                    pass
-                else:
-                    pass
-                if value is not None:
-                    processed_item_dict[internal_name] = value
-            processed_insert_list.append(processed_item_dict)
-        return processed_insert_list
+        if not insert_list:
+            return []
+
+        df = pd.DataFrame(insert_list, dtype=object)
+        df = df.rename(
+            columns={
+                title: column_info["Internal Name"]
+                for title, column_info in self.column_datatypes.items()
+                if title in df.columns
+            }
+        )
+        dtype_map = {
+            column_info["Internal Name"]: column_info["Data Type"]
+            for column_info in self.column_datatypes.values()
+        }
+        for column in df.columns:
+            data_type = dtype_map.get(column)
+            if data_type == "Number":
+                df[column] = pd.to_numeric(df[column], errors="coerce")
+            elif data_type == "Text":
+                df[column] = df[column].astype("string")
+        # NaN/NA from missing keys and failed conversions become None in one vectorized pass
+        df = df.astype(object).where(df.notna(), None)
+
+        return [
+            {key: value for key, value in row.items() if value is not None}
+            for row in df.to_dict(orient="records")
+        ]
 
     def insert_items(self, insert_list: list[dict]) -> None:
 
@@ -406,57 +696,62 @@ class List(BaseList):
         Notes:
             - The `batch_size` parameter determines how many items are inserted in one batch.
             - The method handles batch processing, ensuring that multiple items are inserted efficiently.
+            - Every batch is sent as a single `$batch` request, `max_concurrency` batches at a time; the attachments of the created items are uploaded in the background (`ATTACHMENT_WORKERS` at a time) while the next batches are sent, and the method returns once every upload has finished.
         """
 
-        request_digest = self.digest_value
-        required_columns = self.get_required_columns()
+        primary_internal_name = self._primary_internal_name
 
-        headers = {
-            "Accept": "application/json; odata=verbose",
-            "Content-Type": "application/json; odata=verbose",
-            "X-RequestDigest": request_digest,
-        }
         items_to_be_inserted = len(insert_list)
         self.logger.info("Starting insertion...")
         self.logger.info("Items left for insertion: %s", len(insert_list))
 
-        for item_data in insert_list:
-            idetifier = item_data[required_columns[self.primary_column]["Internal Name"]]
-            attachment_list = item_data.get("Attachment List", None)
+        attachment_pool = ThreadPoolExecutor(max_workers=ATTACHMENT_WORKERS)
+        attachment_futures = {}
 
-            payload = {"__metadata": {"type": self.list_item_data_type}}
+        list_item_data_type = self.list_data_type
 
-            if items_to_be_inserted % self.batch_size == 0:
-                self.logger.info("Waiting for some time to avoid MS timeout")
-                time.sleep(30)
+        def build_operations(batch_items):
+            operations = []
+            for item_data in batch_items:
+                payload = {"__metadata": {"type": list_item_data_type}}
+                for key, value in item_data.items():
+                    if key not in _SKIP_KEYS:
+                        payload[key] = value
+                operations.append(("POST", self._items_url, payload))
+            return operations
+
+        # the uploads already queued are still awaited, and the pool shut down, if a batch fails
+        try:
+            for batch_items, results in self.__send_batches(insert_list, build_operations):
+                for item_data, (status_code, body) in zip(batch_items, results):
+                    idetifier = item_data[primary_internal_name]
+                    attachment_list = item_data.get("Attachment List", None)
+
+                    if status_code != 201:
+                        self.logger.error("Unable to add item %s", idetifier)
+                        self.logger.error("Error details: %s", body)
+                        continue
+
+                    item_id = body.get("d", {}).get("Id", None)
+
+                    #Uploading attachments (if applicable), overlapping with the next batches
+                    if attachment_list:
+                        self.logger.info("Attempting to upload attachments...")
+                        future = attachment_pool.submit(
+                            SharePointOperations.upload_attachments,
+                            self.site_url,
+                            self.list_name,
+                            item_id,
+                            attachment_list,
+                            self.digest_value,
+                            self.session,
+                        )
+                        attachment_futures[future] = idetifier
 
-            if items_to_be_inserted % 10 == 0:
+                items_to_be_inserted -= len(batch_items)
                 self.logger.info("Items left for insertion %s", items_to_be_inserted)
-
-            for key, value in item_data.items():
-                if key not in ["Id", "Attachment List", "Modified"]:
-                    payload[key] = value
-
-            response = self.session.post(
-                f"{self.site_url}_api/web/lists/getbytitle('{self.list_name}')/items",
-                headers=headers,
-                json=payload,
-            )
-            response.raise_for_status()
-            item_id = response.json().get("d", {}).get("Id", None)
-            time.sleep(2)
-
-            if response.status_code != 201:
-                self.logger.error("Unable to add item %s", idetifier)
-                self.logger.error("Error details: %s", response.json())
-
-            #Uploading attachments (if applicable)
-            if attachment_list:
-                self.logger.info("Attempting to upload attachments...")
-                SharePointOperations.upload_attachments(
-                    self.site_url, self.list_name, item_id, attachment_list
-                )
-            items_to_be_inserted -= 1
+        finally:
+            self.__wait_for_attachments(attachment_pool, attachment_futures)
 
 
     def update_list_items(self, update_list: list[dict[str, dict]], attchment_upload_mode:str='UPDATE') -> None:
@@ -482,86 +777,122 @@ class List(BaseList):
         Notes:
             - The `attachment_upload_mode` parameter allows specifying how attachments are handled during updates.
             - The method processes updates in batches based on the `batch_size` attribute.
+            - Every batch is sent as a single `$batch` request, `max_concurrency` batches at a time; attachments are replaced or uploaded in the background while the next batches are sent.
         """
         
-        request_digest = self.digest_value
-        required_columns = self.get_required_columns()
-        if not self.list_item_data_type:
-            list_item_data_type = self.get_list_property(
-                self.list_item_dtype_property_name
-            )
-        else:
-            list_item_data_type = self.list_item_data_type
-
-        time.sleep(1)
-        headers = {
-            "Accept": "application/json; odata=verbose",
-            "Content-Type": "application/json; odata=verbose",
-            "IF-MATCH": "*",
-            "X-HTTP-Method": "MERGE",
-            "X-RequestDigest": request_digest,
-        }
-        payload = {
-            "__metadata": {
-                "type": list_item_data_type
-            }
-        }
+        primary_internal_name = self._primary_internal_name
+        list_item_data_type = self.list_data_type
 
         items_to_be_updated = len(update_list)
         self.logger.info("Starting update...")
+        attachment_pool = ThreadPoolExecutor(max_workers=ATTACHMENT_WORKERS)
+        attachment_futures = {}
+
+        def build_operations(batch_items):
+            operations = []
+            for item in batch_items:
+                for item_id, item_data in item.items():
+                    # a fresh payload per item, so no field value leaks into the next update
+                    payload = {
+                        "__metadata": {"type": list_item_data_type},
+                        **{
+                            key: value
+                            for key, value in item_data.items()
+                            if key not in _SKIP_KEYS
+                        },
+                    }
+                    operations.append(("PATCH", f"{self._items_url}({item_id})", payload))
+            return operations
+
+        # the uploads already queued are still awaited, and the pool shut down, if a batch fails
+        try:
+            for batch_items, results in self.__send_batches(update_list, build_operations):
+                batch_context = [
+                    (item_id, item_data)
+                    for item in batch_items
+                    for item_id, item_data in item.items()
+                ]
+                for (item_id, item_data), (status_code, body) in zip(batch_context, results):
+                    title = item_data[primary_internal_name]
+                    item_attachments = item_data.get("Attachment List", None)
+
+                    if status_code != 204:
+                        self.logger.error("Failed to update item %s: %s", title, body)
+                        continue
+
+                    self.logger.success("Successfully updated item %s", title)
+                    if item_attachments:
+                        self.logger.info("New attachment(s) found in item %s", title)
+                        future = attachment_pool.submit(
+                            self.__replace_attachments,
+                            item_id,
+                            item_attachments,
+                            attchment_upload_mode == 'REPLACE',
+                        )
+                        attachment_futures[future] = title
 
-        for item in update_list:
-            item_id = None
-            item_data = None
-            
-            if items_to_be_updated % self.batch_size == 0:
-                self.logger.info("Waiting for some time to avoid MS timeout")
-                time.sleep(30)
-
-            if items_to_be_updated % 10 == 0:
+                items_to_be_updated -= len(batch_items)
                 self.logger.info("Items left for update: %s", items_to_be_updated)
+        finally:
+            self.__wait_for_attachments(attachment_pool, attachment_futures)
 
-            for k, v in item.items():
-                item_id = k
-                item_data = v
-                for key, value in item_data.items:
-                    if key not in ["Id", "Attachment List", "Modified"]:
-                        payload[key] = value
+    def __replace_attachments(self, item_id: int, attachment_list: list, replace: bool) -> None:
 
-            title = item_data[required_columns[self.primary_column]["Internal Name"]]
-            item_attachments = item_data.get("Attachment List", None)
+        """
+        A private method that uploads the attachments of an updated item, first deleting its existing attachments when `replace` is True.
+
+        Parameters:
+            - item_id (int): The ID of the updated item.
+            - attachment_list (list): The file paths of the attachments to upload.
+            - replace (bool): Whether the existing attachments of the item are deleted before uploading.
+        """
 
-            response = self.session.post(
-                f"{self.site_url}_api/web/lists/getbytitle('{self.list_name}')/items({item_id})",
-                headers=headers,
-                json=payload,
+        if replace:
+            self.logger.info("Attempting to delete existing attachment(s)")
+            existing_attachments = SharePointOperations.get_attachments(
+                self.site_url, self.list_name, item_id, self.session
+            )
+            SharePointOperations.delete_attachments(
+                self.site_url,
+                self.list_name,
+                item_id,
+                existing_attachments,
+                self.digest_value,
+                self.session,
             )
-            response.raise_for_status()
-            time.sleep(2)
 
-            if response.status_code == 204:
-                self.logger.success("Successfully updated item %s", title)
-                if item_attachments:
-                    self.logger.info("New attachment(s) found in item %s", title)
+        self.logger.info("Attempting to upload new attachments...")
+        SharePointOperations.upload_attachments(
+            self.site_url,
+            self.list_name,
+            item_id,
+            attachment_list,
+            self.digest_value,
+            self.session,
+        )
 
-                    if attchment_upload_mode == 'REPLACE':
-                        self.logger.info("Attempting to delete existing attachment(s)")
-                        SharePointOperations.delete_attachments(
-                            self.site_url,
-                            self.list_name,
-                            item_id
-                        )
+    def __wait_for_attachments(self, attachment_pool: ThreadPoolExecutor, attachment_futures: dict) -> None:
 
-                    self.logger.info("Attempting to upload new attachments...")
-                    SharePointOperations.upload_attachments(
-                        self.site_url,
-                        self.list_name,
-                        item_id,
-                        attachment_list=item_attachments
-                    )
+        """
+        A private method that waits for the attachment uploads submitted while writing items, logs the ones that failed and shuts the pool down.
+
+        Parameters:
+            - attachment_pool (ThreadPoolExecutor): The pool running the uploads.
+            - attachment_futures (dict): The submitted uploads, mapped to the identifier of their item.
+        """
 
-            if response.status_code != 204:
-                self.logger.error(f"Failed to add item: {response.content}")
+        try:
+            for future in as_completed(attachment_futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(
+                        "Failed to upload attachments of item %s: %s",
+                        attachment_futures[future],
+                        e,
+                    )
+        finally:
+            attachment_pool.shutdown()
 
     def delete_list_items(self, delete_list:list[dict]) -> None:
 
@@ -583,34 +914,145 @@ class List(BaseList):
         Notes:
             - The `batch_size` parameter determines how many items are deleted in one batch.
             - This method handles batch processing, ensuring efficient deletion of multiple items.
+            - Every batch is sent as a single `$batch` request, `max_concurrency` batches at a time.
         """
 
-        request_digest = self.digest_value
         total_items_to_delete = len(delete_list)
 
+        self.logger.info('Starting deletion...')
+        def build_operations(batch_items):
+            return [
+                ("DELETE", f"{self._items_url}({item['Id']})", None)
+                for item in batch_items
+            ]
+
+        for batch_items, results in self.__send_batches(delete_list, build_operations):
+            for item, (status_code, body) in zip(batch_items, results):
+                if status_code not in (200, 204):
+                    self.logger.error("Failed to delete item %s: %s", item['Id'], body)
+
+            total_items_to_delete -= len(batch_items)
+            self.logger.info("Items left for deletion: %s", total_items_to_delete)
+
+    def __send_batches(self, items: list, build_operations) -> Iterator[tuple[list, list[tuple[int, dict]]]]:
+
+        """
+        A private method that splits `items` into batches of `batch_size` and sends them as `$batch` requests, up to `max_concurrency` at a time.
+
+        Parameters:
+            - items (list): The items to write.
+            - build_operations (callable): A function turning a batch of items into the `(method, url, payload)` operations passed to `_send_batch`.
+
+        Yields:
+            - tuple[list, list[tuple[int, dict]]]: Every batch of items along with the results of its operations, in the order of `items`.
+
+        Notes:
+            - The batches are independent, so their round-trips overlap; throttled requests are retried one by one by the session's retry adapter.
+        """
+
+        batches = [
+            items[batch_start : batch_start + self.batch_size]
+            for batch_start in range(0, len(items), self.batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = executor.map(
+                lambda batch_items: self._send_batch(build_operations(batch_items)),
+                batches,
+            )
+            yield from zip(batches, results)
+
+    def _send_batch(self, operations: list[tuple[str, str, dict]]) -> list[tuple[int, dict]]:
+
+        """
+        Sends several list operations to SharePoint in a single `$batch` request.
+
+        Parameters:
+            - operations (list[tuple[str, str, dict]]): The operations to perform, each given as `(method, url, payload)`. `method` is one of "POST", "PATCH" or "DELETE"; `payload` is the JSON body of the operation, or None for deletions.
+
+        Returns:
+            - list[tuple[int, dict]]: The status code and parsed JSON body (None when empty) of every operation, in the order they were given. Operations SharePoint returned no response for are given a None status code.
+
+        Notes:
+            - All operations are sent in a single round-trip, each in its own changeset, so every operation succeeds or fails on its own as when the items were written one by one.
+            - PATCH and DELETE operations are sent with `IF-MATCH: *`, overwriting the item regardless of its version.
+        """
+
+        if not operations:
+            return []
+
+        batch_guid = uuid.uuid4().hex
+
+        batch_body = []
+        for method, url, payload in operations:
+            # one changeset per operation: SharePoint stops a changeset at its first failure, so a failed item does not take down the others
+            changeset_guid = uuid.uuid4().hex
+            batch_body.append(f"--batch_{batch_guid}")
+            batch_body.append(f"Content-Type: multipart/mixed; boundary=changeset_{changeset_guid}")
+            batch_body.append("")
+            batch_body.append(f"--changeset_{changeset_guid}")
+            batch_body.extend(BATCH_PART_HEADERS)
+            batch_body.append(f"{method} {url} HTTP/1.1")
+            batch_body.append(BATCH_ACCEPT_HEADER)
+            if method != "POST":
+                batch_body.append("IF-MATCH: *")
+            if payload is not None:
+                batch_body.append(BATCH_CONTENT_TYPE_HEADER)
+                batch_body.append("")
+                batch_body.append(json_dumps(payload))
+            else:
+                batch_body.append("")
+            batch_body.append("")
+            batch_body.append(f"--changeset_{changeset_guid}--")
+        batch_body.append(f"--batch_{batch_guid}--")
+        batch_body.append("")
+
         headers = {
-            "Accept": "application/json; odata=verbose",
-            "Content-Type": "application/json; odata=verbose",
-            "X-RequestDigest": request_digest,
-            "IF-MATCH": "*",
-            "X-HTTP-Method": "DELETE"
+            "Accept": "application/json;odata=verbose",
+            "Content-Type": f"multipart/mixed; boundary=batch_{batch_guid}",
+            "X-RequestDigest": self.digest_value,
         }
+        response = self._request(
+            "POST",
+            self._batch_url,
+            headers=headers,
+            data="\r\n".join(batch_body).encode("utf-8"),
+        )
+        if response.status_code in (404, 412):
+            self._invalidate_metadata_cache()
+        response.raise_for_status()
 
-        self.logger.info('Starting deletion...')
-        for item in delete_list:
-            item_id = item['Id']
+        results = self.__parse_batch_response(response.text)
+        if any(status_code in (404, 412) for status_code, _ in results):
+            # the list was renamed, recreated or its schema changed under us
+            self._invalidate_metadata_cache()
+        if len(results) < len(operations):
+            # SharePoint stopped answering part-way, the remaining operations are reported as failed rather than dropped
+            missing = {"error": "No response returned for this operation"}
+            results.extend((None, missing) for _ in range(len(operations) - len(results)))
 
-            if total_items_to_delete % self.batch_size == 0:
-                self.logger.info("Waiting for some time to avoid MS timeout")
-                time.sleep(30)
+        return results
 
-            if total_items_to_delete % 10 == 0:
-                self.logger.info("Items left for update: %s", total_items_to_delete)
+    @staticmethod
+    def __parse_batch_response(response_text: str) -> list[tuple[int, dict]]:
 
-            response = self.session.post(
-                f"{self.site_url}_api/web/lists/getbytitle('{self.list_name}')/Items({item_id})",
-                headers=headers
-            )
-            response.raise_for_status()
-            time.sleep(2)
-            total_items_to_delete -= 1
+        """
+        A private method that extracts the status code and JSON body of every operation from a `$batch` response.
+
+        Parameters:
+            - response_text (str): The multipart body returned by the `$batch` endpoint.
+
+        Returns:
+            - list[tuple[int, dict]]: The status code and parsed JSON body (None when empty or not JSON) of every operation, in response order.
+        """
+
+        results = []
+        for match in BATCH_RESPONSE_PATTERN.finditer(response_text):
+            status_code = int(match.group("status"))
+            body = match.group("body").strip()
+            try:
+                body = json_loads(body) if body else None
+            except ValueError:
+                body = {"error": body}
+            results.append((status_code, body))
+
+        return results
@@ -1,7 +1,68 @@
+import gzip
+import time
 import uuid
+import threading
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
 from requests import Session
+from connector.http_adapter import mount_retry_adapter
 from sharepoint.list.list_operations import ListOperations
 from logger.custom_logger import get_logger
+from utils.serialization import json_dumpb
+
+# site_url -> (digest, refresh_at, expires_at), shared by every batch operation of the process
+_DIGEST_CACHE: dict[str, tuple[str, float, float]] = {}
+_DIGEST_LOCK = threading.Lock()
+# sites whose digest is being refreshed in the background
+_DIGEST_REFRESHING: set[str] = set()
+
+# seconds before the digest timeout at which the digest is no longer used
+DIGEST_EXPIRY_MARGIN = 60
+
+# seconds before the digest timeout at which a new digest is requested in the background
+DIGEST_REFRESH_AHEAD = 300
+
+# MIME headers opening every operation of a changeset
+CHANGESET_PART_HEADERS = b"Content-Type: application/http\r\nContent-Transfer-Encoding: binary\r\n\r\n"
+JSON_CONTENT_TYPE = b"Content-Type: application/json;odata=verbose\r\n"
+DELETE_PART_SUFFIX = b") HTTP/1.1\r\nIF-MATCH: *\r\n\r\n"
+UPDATE_PART_SUFFIX = b") HTTP/1.1\r\n" + JSON_CONTENT_TYPE + b"IF-MATCH: *\r\nX-HTTP-Method: MERGE\r\n"
+
+# bytes of MIME headers and request line added to a batch for every operation
+PART_OVERHEAD_BYTES = 300
+
+# bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 4096
+
+# sites that answered 415 to a compressed batch, their batches are sent uncompressed from then on
+_GZIP_REJECTED: set[str] = set()
+
+# a progress line is logged every this many batches instead of once per batch
+BATCH_LOG_INTERVAL = 50
+
+# SharePoint starts rejecting or timing out well before its 1 MB $batch limit
+MAX_BATCH_BYTES = 200_000
+
+@lru_cache(maxsize=32)
+def _items_url(site_url: str, list_name: str) -> bytes:
+
+    """
+    Builds the encoded items endpoint of a list, as used in the request line of every changeset operation.
+
+    Parameters:
+        - site_url (str): The base URL of the SharePoint site.
+        - list_name (str): The name of the SharePoint list.
+
+    Returns:
+        - bytes: The UTF-8 encoded items endpoint.
+
+    Notes:
+        - The endpoints are cached, since every batch of an operation targets the same list.
+    """
+
+    return f"{site_url}_api/web/lists/getbytitle('{list_name}')/items".encode()
 
 class BatchOperations:
 
@@ -9,17 +70,50 @@ class BatchOperations:
     The `BatchOperations` class provides static methods for handling batch operations in SharePoint lists. This includes creating and managing batches for delete, insert, and update operations, as well as performing these operations in batches to optimize performance and reduce server load.
 
     Static Methods:
+        - prepare_session(session: Session, pool_size: int = 32) -> Session
         - __get_request_digest(site_url: str, session: Session) -> str
-        - __create_delete_batch(site_url: str, list_name: str, item_ids: list, batch_guid: str) -> str
-        - delete_items_in_batches(site_url: str, list_name: str, items: list, session: Session, batch_size=100) -> None
-        - __create_insert_batch(site_url: str, list_name: str, insert_list: list, batch_guid: str, session: Session) -> str
-        - insert_items_in_batches(site_url: str, list_name: str, items: list, session: Session, batch_size=100) -> None
-        - __create_update_batch(site_url: str, list_name: str, update_dict: dict[str, list], batch_guid: str, session: Session) -> str
-        - update_items_in_batches(site_url: str, list_name: str, items: dict[str, list], session: Session, batch_size=100) -> None
+        - __fetch_request_digest(site_url: str, session: Session, background: bool = False) -> str
+        - __create_delete_batch(site_url: str, list_name: str, item_ids: list, batch_guid: str) -> Iterator[bytes]
+        - delete_items_in_batches(site_url: str, list_name: str, items: list, session: Session, batch_size=100, max_concurrency=4, max_batch_bytes=MAX_BATCH_BYTES, stream_body=False, compress=False) -> None
+        - __create_insert_batch(site_url: str, list_name: str, payloads: Iterable[bytes], batch_guid: str) -> Iterator[bytes]
+        - insert_items_in_batches(site_url: str, list_name: str, items: list, session: Session, batch_size=100, max_concurrency=4, max_batch_bytes=MAX_BATCH_BYTES, stream_body=False, compress=False) -> None
+        - __create_update_batch(site_url: str, list_name: str, update_items: Iterable[tuple], batch_guid: str) -> Iterator[bytes]
+        - update_items_in_batches(site_url: str, list_name: str, items: dict[str, list], session: Session, batch_size=100, max_concurrency=4, max_batch_bytes=MAX_BATCH_BYTES, stream_body=False, compress=False) -> None
+        - __metadata_prefix(list_data_type: str) -> bytes
+        - __item_json(metadata_prefix: bytes, item: dict) -> bytes
+        - __split_batches(items: Iterable, batch_size: int, max_batch_bytes: int, item_size: Callable) -> Iterator[list]
+        - __send_batches(site_url: str, session: Session, batches: Iterable, build_batch_body: Callable, max_concurrency: int, stream_body: bool, compress: bool) -> None
+        - __complete_batch(future: Future, batch_no: int) -> int
     """
 
     logger = get_logger('BatchOperations')
 
+    @staticmethod
+    def prepare_session(session: Session, pool_size: int = 32) -> Session:
+
+        """
+        Mounts a pooled, retrying `HTTPAdapter` on a session so that concurrent batches reuse keep-alive connections.
+
+        Parameters:
+            - session (Session): The authenticated session used for the batch operations.
+            - pool_size (int, optional): The number of connections kept open per host, default is 32.
+
+        Returns:
+            - Session: The same session, for chaining.
+
+        Example:
+            session = BatchOperations.prepare_session(session)
+            BatchOperations.insert_items_in_batches(site_url, list_name, items, session, max_concurrency=8)
+
+        Notes:
+            - Call it once before the `*_in_batches` methods when the session was not created by `SharePointConnector`, which already mounts an equivalent adapter.
+            - `pool_size` should be at least the `max_concurrency` of the batch operations, otherwise connections are reopened.
+            - The adapter is the one `SharePointConnector` mounts, see `mount_retry_adapter`: batch POSTs are only resent when throttled (429/503), since resending one after a gateway 5xx could insert its items twice.
+            - Responses are already requested compressed, `requests` sends `Accept-Encoding: gzip, deflate` by default.
+        """
+
+        return mount_retry_adapter(session, pool_connections=pool_size, pool_maxsize=pool_size)
+
     @staticmethod
     def __get_request_digest(site_url: str, session: Session) -> str:
 
@@ -36,24 +130,256 @@ class BatchOperations:
         Notes:
             - This method is private and used internally to obtain the digest value necessary for batch operations.
             - The digest value is required to authenticate requests made to SharePoint.
+            - The digest is cached per site and reused until `DIGEST_EXPIRY_MARGIN` seconds before the `FormDigestTimeoutSeconds` returned by SharePoint.
+            - From `DIGEST_REFRESH_AHEAD` seconds before the timeout, a new digest is requested in the background while the batches keep using the current one, so they don't wait for the refresh.
         """
 
-        headers = {
-            "Accept": "application/json;odata=verbose",
-            "Content-Type": "application/json;odata=verbose",
-        }
-        response = session.post(f"{site_url}_api/contextinfo", headers=headers)
-        if response.status_code == 200:
-            return response.json()["d"]["GetContextWebInformation"]["FormDigestValue"]
-        else:
-            raise Exception(
-                f"Failed to get request digest: {response.status_code}, {response.text}"
+        with _DIGEST_LOCK:
+            cached = _DIGEST_CACHE.get(site_url)
+            now = time.monotonic()
+            if cached is not None and now < cached[2]:
+                digest, refresh_at, _ = cached
+                if now >= refresh_at and site_url not in _DIGEST_REFRESHING:
+                    _DIGEST_REFRESHING.add(site_url)
+                    threading.Thread(
+                        target=BatchOperations.__fetch_request_digest,
+                        args=(site_url, session, True),
+                        daemon=True,
+                    ).start()
+                return digest
+
+            return BatchOperations.__fetch_request_digest(site_url, session)
+
+    @staticmethod
+    def __fetch_request_digest(site_url: str, session: Session, background: bool = False) -> str:
+
+        """
+        Requests a new digest value from SharePoint and caches it.
+
+        Parameters:
+            - site_url (str): The base URL of the SharePoint site.
+            - session (Session): An authenticated session object for making requests.
+            - background (bool, optional): Whether the digest is refreshed ahead of its expiry from a background thread, default is False. The caller holds `_DIGEST_LOCK` otherwise.
+
+        Returns:
+            - str: The new request digest value.
+
+        Notes:
+            - This method is private, see `__get_request_digest`.
+            - A failed background refresh is only logged, the next call after the expiry of the current digest requests it again.
+        """
+
+        try:
+            headers = {
+                "Accept": "application/json;odata=verbose",
+                "Content-Type": "application/json;odata=verbose",
+            }
+            response = session.post(f"{site_url}_api/contextinfo", headers=headers)
+            if response.status_code != 200:
+                raise Exception(
+                    f"Failed to get request digest: {response.status_code}, {response.text}"
+                )
+
+            context_info = response.json()["d"]["GetContextWebInformation"]
+            digest = context_info["FormDigestValue"]
+            timeout = context_info.get("FormDigestTimeoutSeconds", 1800)
+            now = time.monotonic()
+            entry = (
+                digest,
+                now + timeout - DIGEST_REFRESH_AHEAD,
+                now + timeout - DIGEST_EXPIRY_MARGIN,
             )
+            if background:
+                with _DIGEST_LOCK:
+                    _DIGEST_CACHE[site_url] = entry
+            else:
+                _DIGEST_CACHE[site_url] = entry
+            return digest
+        except Exception as e:
+            if not background:
+                raise
+            BatchOperations.logger.warning("Failed to refresh the request digest ahead of its expiry: %s", e)
+        finally:
+            if background:
+                with _DIGEST_LOCK:
+                    _DIGEST_REFRESHING.discard(site_url)
+
+    @staticmethod
+    def __split_batches(
+        items: Iterable, batch_size: int, max_batch_bytes: int, item_size: Callable
+    ) -> Iterator[list]:
+
+        """
+        Splits items into batches bounded both by item count and by the estimated size of the batch body.
+
+        Parameters:
+            - items (Iterable): The items to split.
+            - batch_size (int): The maximum number of items in a batch.
+            - max_batch_bytes (int): The approximate maximum size of a batch body, in bytes.
+            - item_size (Callable): A function returning the size of the payload of an item, in bytes.
+
+        Returns:
+            - Iterator[list]: The batches, in the order of `items`. An item larger than `max_batch_bytes` is sent in a batch of its own.
+
+        Notes:
+            - This method is private and shared by the delete, insert and update operations.
+            - Every item is counted with `PART_OVERHEAD_BYTES` on top of its payload for its MIME headers and request line.
+        """
+
+        batch = []
+        batch_bytes = 0
+        for item in items:
+            size = item_size(item) + PART_OVERHEAD_BYTES
+            if batch and (len(batch) >= batch_size or batch_bytes + size > max_batch_bytes):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(item)
+            batch_bytes += size
+        if batch:
+            yield batch
+
+    @staticmethod
+    def __send_batches(
+        site_url: str,
+        session: Session,
+        batches: Iterable,
+        build_batch_body: Callable,
+        max_concurrency: int,
+        stream_body: bool,
+        compress: bool,
+    ) -> None:
+
+        """
+        Sends batch requests to SharePoint, up to `max_concurrency` at a time.
+
+        Parameters:
+            - site_url (str): The base URL of the SharePoint site.
+            - session (Session): An authenticated session object for making requests.
+            - batches (Iterable): The batches of items to send.
+            - build_batch_body (Callable): A function taking a batch and its batch guid, and returning the chunks of the body of the batch request.
+            - max_concurrency (int): The maximum number of batch requests in flight.
+            - stream_body (bool): Whether the body is streamed with chunked transfer encoding instead of being joined before sending.
+            - compress (bool): Whether bodies larger than `GZIP_MIN_BYTES` are sent gzip-compressed. Ignored when `stream_body` is set. A site answering 415 to a compressed batch gets that batch again uncompressed, and no compressed batch afterwards.
+
+        Returns:
+            - None: This method doesn't return anything but raises on the first batch that fails.
+
+        Notes:
+            - This method is private and shared by the delete, insert and update operations.
+            - Progress is logged every `BATCH_LOG_INTERVAL` batches and once all batches are sent, rather than for every batch.
+            - The body of every batch is built by the worker sending it, and at most `2 * max_concurrency` batches are taken from `batches` ahead of the ones being sent.
+            - Throttled (429/503) requests are retried by the session's retry adapter, which honours `Retry-After`. A streamed body can not be sent twice, so throttled streamed batches fail instead.
+        """
+
+        batch_endpoint = f"{site_url}_api/$batch"
+
+        def post_batch(batch):
+            batch_guid = uuid.uuid4().hex
+            batch_body = build_batch_body(batch, batch_guid)
+            compressed_body = None
+            if not stream_body:
+                batch_body = b"".join(batch_body)
+                if compress and site_url not in _GZIP_REJECTED and len(batch_body) > GZIP_MIN_BYTES:
+                    # the repeated part headers compress very well, level 1 keeps the CPU cost low
+                    compressed_body = gzip.compress(batch_body, compresslevel=1)
+            request_digest = BatchOperations.__get_request_digest(
+                site_url=site_url, session=session
+            )
+            batch_headers = {
+                "Accept": "application/json;odata=verbose",
+                "Content-Type": f"multipart/mixed; boundary=batch_{batch_guid}",
+                "X-RequestDigest": request_digest,
+            }
+            if compressed_body is not None:
+                response = session.post(
+                    batch_endpoint,
+                    headers={**batch_headers, "Content-Encoding": "gzip"},
+                    data=compressed_body,
+                )
+                if response.status_code != 415:
+                    response.raise_for_status()
+                    return
+                _GZIP_REJECTED.add(site_url)
+                BatchOperations.logger.warning("%s does not accept compressed batches, sending them uncompressed", site_url)
+            response = session.post(batch_endpoint, headers=batch_headers, data=batch_body)
+            response.raise_for_status()
+
+        batch_no = 0
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            for batch in batches:
+                in_flight.append(executor.submit(post_batch, batch))
+                # keep the next batches queued, without pulling (and serializing) every batch up front
+                if len(in_flight) >= 2 * max_concurrency:
+                    batch_no = BatchOperations.__complete_batch(in_flight.popleft(), batch_no)
+            while in_flight:
+                batch_no = BatchOperations.__complete_batch(in_flight.popleft(), batch_no)
+
+        BatchOperations.logger.success('Processed %s batches successfully', batch_no)
+
+    @staticmethod
+    def __complete_batch(future, batch_no: int) -> int:
+
+        """
+        Waits for a sent batch, raising if it failed, and logs the progress every `BATCH_LOG_INTERVAL` batches.
+
+        Parameters:
+            - future (Future): The future of the batch request.
+            - batch_no (int): The number of batches completed before this one.
+
+        Returns:
+            - int: The number of batches completed, including this one.
+        """
+
+        future.result()
+        batch_no += 1
+        if batch_no % BATCH_LOG_INTERVAL == 0:
+            BatchOperations.logger.info('Processed %s batches', batch_no)
+        return batch_no
+
+    @staticmethod
+    def __metadata_prefix(list_data_type: str) -> bytes:
+
+        """
+        Serializes the `__metadata` entry shared by every insert and update payload of a list, as the opening of a JSON object.
+
+        Parameters:
+            - list_data_type (str): The `ListItemEntityTypeFullName` of the list.
+
+        Returns:
+            - bytes: The encoded `{"__metadata":{...},` prefix.
+        """
+
+        return b'{"__metadata":' + json_dumpb({"type": list_data_type}) + b","
+
+    @staticmethod
+    def __item_json(metadata_prefix: bytes, item: dict) -> bytes:
+
+        """
+        Serializes the payload of an item, prepending the pre-serialized `__metadata` entry instead of copying it into every item.
+
+        Parameters:
+            - metadata_prefix (bytes): The prefix returned by `__metadata_prefix`.
+            - item (dict): The field values of the item.
+
+        Returns:
+            - bytes: The encoded JSON payload.
+        """
+
+        if "__metadata" in item:
+            # the item brings its own metadata, which takes precedence
+            return json_dumpb(item)
+
+        item_json = json_dumpb(item)
+        if item_json == b"{}":
+            return metadata_prefix[:-1] + b"}"
+        return metadata_prefix + item_json[1:]
 
     @staticmethod
     def __create_delete_batch(
         site_url: str, list_name: str, item_ids: list, batch_guid: str
-    ) -> str:
+    ) -> Iterator[bytes]:
         
         """
         Creates a batch request for deleting items from a SharePoint list.
@@ -64,43 +390,35 @@ class BatchOperations:
             - item_ids (list): A list of item IDs to be deleted.
             - batch_guid (str): A unique identifier for the batch request.
 
-        Returns:
-            - str: The body content of the batch request for deletion.
+        Yields:
+            - bytes: The UTF-8 encoded body of the batch request for deletion, one changeset part at a time.
 
         Notes:
             - This method generates body of a batch request for deleting multiple items.
             - The `batch_guid` ensures that the batch request is unique and traceable.
         """
 
-        changeset_guid = str(uuid.uuid4())
-        batch_body = []
-        batch_body.append(f"--batch_{batch_guid}")
-        batch_body.append(
-            f"Content-Type: multipart/mixed; boundary=changeset_{changeset_guid}"
+        changeset_guid = uuid.uuid4().hex
+        # everything before the item id, identical for every operation of the changeset
+        part_prefix = (
+            f"--changeset_{changeset_guid}\r\n".encode()
+            + CHANGESET_PART_HEADERS
+            + b"DELETE " + _items_url(site_url, list_name) + b"("
+        )
+        yield (
+            f"--batch_{batch_guid}\r\n"
+            f"Content-Type: multipart/mixed; boundary=changeset_{changeset_guid}\r\n"
+            "\r\n".encode()
         )
-        batch_body.append("")
 
         for item_id in item_ids:
-            batch_body.append(f"--changeset_{changeset_guid}")
-            batch_body.append("Content-Type: application/http")
-            batch_body.append("Content-Transfer-Encoding: binary")
-            batch_body.append("")
-
-            batch_body.append(
-                f"DELETE {site_url}_api/web/lists/getbytitle('{list_name}')/items({item_id}) HTTP/1.1"
-            )
-            batch_body.append("IF-MATCH: *")
-            batch_body.append("Content-Type: application/json;odata=verbose")
-            batch_body.append("")
-
-        batch_body.append(f"--changeset_{changeset_guid}--")
-        batch_body.append(f"--batch_{batch_guid}--")
+            yield b"".join((part_prefix, str(item_id).encode(), DELETE_PART_SUFFIX))
 
-        return "\n".join(batch_body)
+        yield f"--changeset_{changeset_guid}--\r\n--batch_{batch_guid}--\r\n".encode()
 
     @staticmethod
     def delete_items_in_batches(
-        site_url: str, list_name: str, items: list, session: Session, batch_size=100
+        site_url: str, list_name: str, items: list, session: Session, batch_size=100, max_concurrency=4, max_batch_bytes=MAX_BATCH_BYTES, stream_body=False, compress=False
     ) -> None:
         
         """
@@ -112,6 +430,10 @@ class BatchOperations:
             - items (list): A list of items to be deleted, each item should include the ID.
             - session (Session): An authenticated session object for making requests.
             - batch_size (int, optional): The size of each batch request, default is 100.
+            - max_concurrency (int, optional): The number of batch requests sent at the same time, default is 4.
+            - max_batch_bytes (int, optional): The approximate maximum size of each batch request body, default is `MAX_BATCH_BYTES`.
+            - stream_body (bool, optional): Whether each batch body is streamed with chunked transfer encoding rather than built in memory first, default is False.
+            - compress (bool, optional): Whether batch bodies larger than `GZIP_MIN_BYTES` are sent with `Content-Encoding: gzip`, default is False. Only enable it for sites that accept compressed requests.
 
         Returns:
             - None: This method doesn't return anything but performs batch delete operations.
@@ -119,52 +441,32 @@ class BatchOperations:
         Notes:
             - The method handles the deletion of items in specified batch sizes to optimize performance.
             - The `batch_size` parameter controls how many items are included in each batch request.
+            - Batches are independent and are sent `max_concurrency` at a time.
+            - A batch is closed once it holds `batch_size` items or its body would exceed `max_batch_bytes`, whichever comes first.
         """
 
-        batch_endpoint = f"{site_url}_api/$batch"
-        headers = {
-            "Accept": "application/json;odata=verbose",
-            "Content-Type": "application/json;odata=verbose",
-        }
-        batch_no = 1
-        for i in range(0, len(items), batch_size):
-            batch_guid = str(uuid.uuid4())
-            batch_items = items[i : i + batch_size]
-            item_ids = [item["Id"] for item in batch_items]
-            batch_body = BatchOperations.__create_delete_batch(
+        def build_batch_body(batch_items, batch_guid):
+            return BatchOperations.__create_delete_batch(
                 site_url=site_url,
                 list_name=list_name,
-                item_ids=item_ids,
+                item_ids=[item["Id"] for item in batch_items],
                 batch_guid=batch_guid,
             )
 
-            request_digest = BatchOperations.__get_request_digest(
-                site_url=site_url, session=session
-            )
-
-            batch_headers = headers.copy()
-            batch_headers.update(
-                {
-                    "Content-Type": f"multipart/mixed; boundary=batch_{batch_guid}",
-                    "X-RequestDigest": request_digest,
-                }
-            )
-
-            response = session.post(
-                batch_endpoint, headers=batch_headers, data=batch_body
-            )
-            response.raise_for_status()
-            BatchOperations.logger.success('Processed batch %s successfully', batch_no)
-            batch_no += 1
+        batches = BatchOperations.__split_batches(
+            items, batch_size, max_batch_bytes, item_size=lambda item: 0
+        )
+        BatchOperations.__send_batches(
+            site_url, session, batches, build_batch_body, max_concurrency, stream_body, compress
+        )
 
     @staticmethod
     def __create_insert_batch(
         site_url: str,
         list_name: str,
-        insert_list: list,
+        payloads: Iterable[bytes],
         batch_guid: str,
-        session: Session,
-    ) -> str:
+    ) -> Iterator[bytes]:
         
         """
         Creates a batch request for inserting items into a SharePoint list.
@@ -172,59 +474,44 @@ class BatchOperations:
         Parameters:
             - site_url (str): The base URL of the SharePoint site.
             - list_name (str): The name of the SharePoint list.
-            - insert_list (list): A list of dictionaries where each dictionary represents an item to be inserted.
+            - payloads (Iterable[bytes]): The serialized JSON payloads of the items to be inserted, see `__item_json`.
             - batch_guid (str): A unique identifier for the batch request.
-            - session (Session): An authenticated session object for making requests.
 
-        Returns:
-            - str: The body content of the batch request for insertion.
+        Yields:
+            - bytes: The UTF-8 encoded body of the batch request for insertion, one changeset part at a time.
 
         Notes:
             - This method generates body of a batch request for inserting multiple items into the list.
             - The `batch_guid` ensures the uniqueness of the batch request.
         """
 
-        changeset_guid = str(uuid.uuid4())
-        insert_dict = {
-            "__metadata": {
-                "type": ListOperations.get_list_data_type(
-                    site_url=site_url, list_name=list_name, session=session
-                )
-            }
-        }
-        batch_body = []
-        batch_body.append(f"--batch_{batch_guid}")
-        batch_body.append(
-            f"Content-Type: multipart/mixed; boundary=changeset_{changeset_guid}"
+        changeset_guid = uuid.uuid4().hex
+        # everything before the Content-Length, identical for every operation of the changeset
+        part_prefix = (
+            f"--changeset_{changeset_guid}\r\n".encode()
+            + CHANGESET_PART_HEADERS
+            + b"POST " + _items_url(site_url, list_name) + b" HTTP/1.1\r\n"
+            + JSON_CONTENT_TYPE
+        )
+        yield (
+            f"--batch_{batch_guid}\r\n"
+            f"Content-Type: multipart/mixed; boundary=changeset_{changeset_guid}\r\n"
+            "\r\n".encode()
         )
-        batch_body.append("")
-
-        for item in insert_list:
-            body_dict = insert_dict.copy()
-            body_dict.update(item)
-
-            batch_body.append(f"--changeset_{changeset_guid}")
-            batch_body.append("Content-Type: application/http")
-            batch_body.append("Content-Transfer-Encoding: binary")
-            batch_body.append("")
-
-            batch_body.append(
-                f"POST {site_url}_api/web/lists/getbytitle('{list_name}')/items HTTP/1.1"
-            )
-
-            batch_body.append(f"{body_dict}")
-
-            batch_body.append("Content-Type: application/json;odata=verbose")
-            batch_body.append("")
 
-        batch_body.append(f"--changeset_{changeset_guid}--")
-        batch_body.append(f"--batch_{batch_guid}--")
+        for body_json in payloads:
+            yield b"".join((
+                part_prefix,
+                f"Content-Length: {len(body_json)}\r\n\r\n".encode(),
+                body_json,
+                b"\r\n",
+            ))
 
-        return "\n".join(batch_body)
+        yield f"--changeset_{changeset_guid}--\r\n--batch_{batch_guid}--\r\n".encode()
 
     @staticmethod
     def insert_items_in_batches(
-        site_url: str, list_name: str, items: list, session: Session, batch_size=100
+        site_url: str, list_name: str, items: list, session: Session, batch_size=100, max_concurrency=4, max_batch_bytes=MAX_BATCH_BYTES, stream_body=False, compress=False
     ) -> None:
         
         """
@@ -236,6 +523,10 @@ class BatchOperations:
             - items (list): A list of dictionaries where each dictionary represents an item to be inserted.
             - session (Session): An authenticated session object for making requests.
             - batch_size (int, optional): The size of each batch request, default is 100.
+            - max_concurrency (int, optional): The number of batch requests sent at the same time, default is 4.
+            - max_batch_bytes (int, optional): The approximate maximum size of each batch request body, default is `MAX_BATCH_BYTES`.
+            - stream_body (bool, optional): Whether each batch body is streamed with chunked transfer encoding rather than built in memory first, default is False.
+            - compress (bool, optional): Whether batch bodies larger than `GZIP_MIN_BYTES` are sent with `Content-Encoding: gzip`, default is False. Only enable it for sites that accept compressed requests.
 
         Returns:
             - None: This method doesn't return anything but performs batch insert operations.
@@ -243,52 +534,40 @@ class BatchOperations:
         Notes:
             - The method handles the insertion of items in specified batch sizes to improve efficiency.
             - The `batch_size` parameter determines how many items are included in each batch request.
+            - Batches are independent and are sent `max_concurrency` at a time.
+            - A batch is closed once it holds `batch_size` items or its body would exceed `max_batch_bytes`, whichever comes first.
         """
 
-        batch_endpoint = f"{site_url}_api/$batch"
-        headers = {
-            "Accept": "application/json;odata=verbose",
-            "Content-Type": "application/json;odata=verbose",
-        }
-        batch_no = 1
-        for i in range(0, len(items), batch_size):
-            batch_guid = str(uuid.uuid4())
-            batch_items = items[i : i + batch_size]
-            batch_body = BatchOperations.__create_insert_batch(
+        metadata_prefix = BatchOperations.__metadata_prefix(
+            ListOperations.get_list_data_type(
+                site_url=site_url, list_name=list_name, session=session
+            )
+        )
+
+        def build_batch_body(batch_payloads, batch_guid):
+            return BatchOperations.__create_insert_batch(
                 site_url=site_url,
                 list_name=list_name,
-                insert_list=batch_items,
+                payloads=batch_payloads,
                 batch_guid=batch_guid,
-                session=session,
             )
 
-            request_digest = BatchOperations.__get_request_digest(
-                site_url=site_url, session=session
-            )
-
-            batch_headers = headers.copy()
-            batch_headers.update(
-                {
-                    "Content-Type": f"multipart/mixed; boundary=batch_{batch_guid}",
-                    "X-RequestDigest": request_digest,
-                }
-            )
-
-            response = session.post(
-                batch_endpoint, headers=batch_headers, data=batch_body
-            )
-            response.raise_for_status()
-            BatchOperations.logger.success('Processed batch %s successfully', batch_no)
-            batch_no += 1
+        # every item is serialized once, and that size is what the batches are split on
+        payloads = (BatchOperations.__item_json(metadata_prefix, item) for item in items)
+        batches = BatchOperations.__split_batches(
+            payloads, batch_size, max_batch_bytes, item_size=len
+        )
+        BatchOperations.__send_batches(
+            site_url, session, batches, build_batch_body, max_concurrency, stream_body, compress
+        )
 
     @staticmethod
     def __create_update_batch(
         site_url: str,
         list_name: str,
-        update_dict: dict[str, list],
+        update_items: Iterable[tuple],
         batch_guid: str,
-        session: Session,
-    ) -> str:
+    ) -> Iterator[bytes]:
         
         """
         Creates a batch request for updating items in a SharePoint list.
@@ -296,57 +575,41 @@ class BatchOperations:
         Parameters:
             - site_url (str): The base URL of the SharePoint site.
             - list_name (str): The name of the SharePoint list.
-            - update_dict (dict[str, list]): A dictionary where the key is an item ID and the value is a list of fields to update.
+            - update_items (Iterable[tuple]): The `(item ID, serialized JSON payload)` pairs of the batch, see `__item_json`.
             - batch_guid (str): A unique identifier for the batch request.
-            - session (Session): An authenticated session object for making requests.
 
-        Returns:
-            - str: The body content of the batch request for updating.
+        Yields:
+            - bytes: The UTF-8 encoded body of the batch request for updating, one changeset part at a time.
 
         Notes:
             - This method generates body of a batch request for updating multiple items.
             - The `batch_guid` ensures that the batch request is unique and traceable.
         """
 
-        changeset_guid = str(uuid.uuid4())
-        insert_dict = {
-            "__metadata": {
-                "type": ListOperations.get_list_data_type(
-                    site_url=site_url, list_name=list_name, session=session
-                )
-            }
-        }
-        batch_body = []
-        batch_body.append(f"--batch_{batch_guid}")
-        batch_body.append(
-            f"Content-Type: multipart/mixed; boundary=changeset_{changeset_guid}"
+        changeset_guid = uuid.uuid4().hex
+        # everything before the item id, identical for every operation of the changeset
+        part_prefix = (
+            f"--changeset_{changeset_guid}\r\n".encode()
+            + CHANGESET_PART_HEADERS
+            + b"PATCH " + _items_url(site_url, list_name) + b"("
+        )
+        yield (
+            f"--batch_{batch_guid}\r\n"
+            f"Content-Type: multipart/mixed; boundary=changeset_{changeset_guid}\r\n"
+            "\r\n".encode()
         )
-        batch_body.append("")
-
-        for old_id, update_item in update_dict.items():
-            body_dict = insert_dict.copy()
-            body_dict.update(update_item)
-
-            batch_body.append(f"--changeset_{changeset_guid}")
-            batch_body.append("Content-Type: application/http")
-            batch_body.append("Content-Transfer-Encoding: binary")
-            batch_body.append("")
-
-            batch_body.append(
-                f"PATCH {site_url}_api/web/lists/getbytitle('{list_name}')/items({old_id}) HTTP/1.1"
-            )
-
-            batch_body.append(f"{body_dict}")
-
-            batch_body.append("Content-Type: application/json;odata=verbose")
-            batch_body.append("IF-MATCH: *")
-            batch_body.append("X-HTTP-Method: MERGE")
-            batch_body.append("")
 
-        batch_body.append(f"--changeset_{changeset_guid}--")
-        batch_body.append(f"--batch_{batch_guid}--")
+        for old_id, body_json in update_items:
+            yield b"".join((
+                part_prefix,
+                str(old_id).encode(),
+                UPDATE_PART_SUFFIX,
+                f"Content-Length: {len(body_json)}\r\n\r\n".encode(),
+                body_json,
+                b"\r\n",
+            ))
 
-        return "\n".join(batch_body)
+        yield f"--changeset_{changeset_guid}--\r\n--batch_{batch_guid}--\r\n".encode()
 
     @staticmethod
     def update_items_in_batches(
@@ -355,6 +618,10 @@ class BatchOperations:
         items: dict[str, list],
         session: Session,
         batch_size=100,
+        max_concurrency=4,
+        max_batch_bytes=MAX_BATCH_BYTES,
+        stream_body=False,
+        compress=False,
     ) -> None:
         
         """
@@ -366,6 +633,10 @@ class BatchOperations:
             - items (dict[str, list]): A dictionary where the key is an item ID and the value is a list of fields to update.
             - session (Session): An authenticated session object for making requests.
             - batch_size (int, optional): The size of each batch request, default is 100.
+            - max_concurrency (int, optional): The number of batch requests sent at the same time, default is 4.
+            - max_batch_bytes (int, optional): The approximate maximum size of each batch request body, default is `MAX_BATCH_BYTES`.
+            - stream_body (bool, optional): Whether each batch body is streamed with chunked transfer encoding rather than built in memory first, default is False.
+            - compress (bool, optional): Whether batch bodies larger than `GZIP_MIN_BYTES` are sent with `Content-Encoding: gzip`, default is False. Only enable it for sites that accept compressed requests.
 
         Returns:
             - None: This method doesn't return anything but performs batch update operations.
@@ -373,44 +644,32 @@ class BatchOperations:
         Notes:
             - The method handles the updating of items in specified batch sizes to optimize performance.
             - The `batch_size` parameter controls how many updates are included in each batch request.
+            - Batches are independent and are sent `max_concurrency` at a time.
+            - A batch is closed once it holds `batch_size` items or its body would exceed `max_batch_bytes`, whichever comes first.
         """
 
-        def dict_batches(input_dict, batch_size):
-            items = list(input_dict.items())
-            for i in range(0, len(items), batch_size):
-                yield dict(items[i : i + batch_size])
+        metadata_prefix = BatchOperations.__metadata_prefix(
+            ListOperations.get_list_data_type(
+                site_url=site_url, list_name=list_name, session=session
+            )
+        )
 
-        batch_endpoint = f"{site_url}_api/$batch"
-        headers = {
-            "Accept": "application/json;odata=verbose",
-            "Content-Type": "application/json;odata=verbose",
-        }
-        batch_no = 1
-        for batch in dict_batches(items, batch_size):
-            batch_guid = str(uuid.uuid4())
-            batch_body = BatchOperations.__create_update_batch(
+        def build_batch_body(batch, batch_guid):
+            return BatchOperations.__create_update_batch(
                 site_url=site_url,
                 list_name=list_name,
-                update_dict=batch,
+                update_items=batch,
                 batch_guid=batch_guid,
-                session=session,
             )
 
-            request_digest = BatchOperations.__get_request_digest(
-                site_url=site_url, session=session
-            )
-
-            batch_headers = headers.copy()
-            batch_headers.update(
-                {
-                    "Content-Type": f"multipart/mixed; boundary=batch_{batch_guid}",
-                    "X-RequestDigest": request_digest,
-                }
-            )
-
-            response = session.post(
-                batch_endpoint, headers=batch_headers, data=batch_body
-            )
-            response.raise_for_status()
-            BatchOperations.logger.success('Processed batch %s successfully', batch_no)
-            batch_no += 1
+        # every item is serialized once, and that size is what the batches are split on
+        payloads = (
+            (old_id, BatchOperations.__item_json(metadata_prefix, update_item))
+            for old_id, update_item in items.items()
+        )
+        batches = BatchOperations.__split_batches(
+            payloads, batch_size, max_batch_bytes, item_size=lambda pair: len(pair[1])
+        )
+        BatchOperations.__send_batches(
+            site_url, session, batches, build_batch_body, max_concurrency, stream_body, compress
+        )
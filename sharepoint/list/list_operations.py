@@ -1,7 +1,21 @@
-import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 import requests
 from requests import Session
 from logger.custom_logger import get_logger
+from sharepoint.common.sharepoint_operations import SharePointOperations
+from sharepoint.common.exceptions import ListNotFoundError
+from sharepoint.common.id_ranges import MAX_PAGE_SIZE, get_items_by_id_range
+from sharepoint.common.metadata_cache import get_cached_metadata, invalidate_metadata_cache
+from utils.serialization import json_loads
+
+# Accept headers of the read requests: no OData metadata, falling back to verbose where it isn't supported
+ACCEPT_MIN = "application/json;odata=nometadata"
+ACCEPT_VERBOSE = "application/json;odata=verbose"
+
+# attachment lookups running at the same time in get_simplified_list
+ATTACHMENT_WORKERS = 16
 
 
 class ListOperations:
@@ -13,12 +27,21 @@ class ListOperations:
 
     Static Methods:
         - get_required_columns(site_url: str, list_name: str, session: requests.Session) -> dict[dict]
+        - __load_required_columns(site_url: str, list_name: str, session: requests.Session) -> dict[dict]
+        - __get_fields(site_url: str, list_name: str, session: requests.Session) -> list[dict]
         - get_list_property(site_url: str, list_name: str, session: requests.Session, property_name: str) -> str
         - get_list_data_type(site_url: str, list_name: str, session: Session) -> str
-        - get_list_items(site_url: str, list_name: str, session: requests.Session) -> list[dict]
+        - get_list_items(site_url: str, list_name: str, session: requests.Session, max_workers: int = 8, select_fields: list[str] = None, expand_attachments: bool = False, modified_since: datetime = None) -> list[dict]
+        - iter_list_items(site_url: str, list_name: str, session: requests.Session, select_fields: list[str] = None, expand_attachments: bool = False) -> Iterator[dict]
+        - __select_option(select_fields: list[str], expand_attachments: bool) -> str
+        - __iter_pages(endpoint: str, session: requests.Session, list_name: str) -> Iterator[dict]
+        - __get_json(endpoint: str, session: requests.Session, list_name: str) -> dict
+        - __results(data: dict) -> tuple[list, str]
+        - refresh_schema(site_url: str = None, list_name: str = None) -> None
         - get_column_datatypes(site_url: str, list_name: str, session: requests.Session) -> dict
+        - __load_column_datatypes(site_url: str, list_name: str, session: requests.Session) -> dict
         - prepare_data(source_data: dict, column_mappings: dict, old_id: int = None) -> dict
-        - get_simplified_list(site_url: str, list_name: str, list_data: list, required_cols: dict) -> list
+        - get_simplified_list(site_url: str, list_name: str, list_data: list, required_cols: dict, session: requests.Session = None) -> list
     """
 
     logger = get_logger('ListOperations')
@@ -57,18 +80,25 @@ class ListOperations:
 
         Notes:
             - The returned dictionary provides the necessary information for handling columns in list operations.
+            - The result is cached per site and list for `META_CACHE_TTL` seconds, or until `refresh_schema` is called or SharePoint answers 404.
+        """
+
+        return get_cached_metadata(
+            site_url, list_name, "required_columns",
+            lambda: ListOperations.__load_required_columns(site_url, list_name, session),
+        )
+
+    @staticmethod
+    def __load_required_columns(site_url: str, list_name: str, session: requests.Session) -> dict[dict]:
+
+        """
+        A private method that builds the result of `get_required_columns` from the fields of the list.
         """
 
         required_cols = {}
         required_cols["Id"] = {}
 
-        headers = {"Accept": "application/json; odata=verbose"}
-        endpoint = f"{site_url}_api/web/lists/getbytitle('{list_name}')/fields?$filter=Hidden eq false and ReadOnlyField eq false"
-
-        response = session.get(endpoint, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        columns_info = data.get("d", {}).get("results", [])
+        columns_info = ListOperations.__get_fields(site_url, list_name, session)
         for column in columns_info:
             title = column["Title"]
             internal_name = column["EntityPropertyName"]
@@ -83,6 +113,31 @@ class ListOperations:
 
         return required_cols
 
+    @staticmethod
+    def __get_fields(site_url: str, list_name: str, session: requests.Session) -> list[dict]:
+
+        """
+        A private method that retrieves the visible, editable fields of a SharePoint list.
+
+        Parameters:
+            - site_url (str): The base URL of the SharePoint site.
+            - list_name (str): The name of the SharePoint list.
+            - session (requests.Session): An authenticated session object for making requests.
+
+        Returns:
+            - list[dict]: The fields of the list, as returned by SharePoint.
+
+        Notes:
+            - `get_required_columns` and `get_column_datatypes` are both derived from these fields, which are fetched once and cached per site and list for `META_CACHE_TTL` seconds, or until `refresh_schema` is called or SharePoint answers 404.
+        """
+
+        def load_fields():
+            endpoint = f"{site_url}_api/web/lists/getbytitle('{list_name}')/fields?$filter=Hidden eq false and ReadOnlyField eq false"
+            fields, _ = ListOperations.__results(ListOperations.__get_json(endpoint, session, list_name))
+            return fields
+
+        return get_cached_metadata(site_url, list_name, "fields", load_fields)
+
     @staticmethod
     def get_list_property(
         site_url: str, list_name: str, session: requests.Session, property_name: str
@@ -105,19 +160,26 @@ class ListOperations:
 
         Notes:
             - The property name should be valid for the SharePoint list and correctly spelled.
+            - All the properties of the list are fetched with the first call and cached per site and list for `META_CACHE_TTL` seconds, or until `refresh_schema` is called or SharePoint answers 404.
+            - A `ListNotFoundError` is raised if SharePoint does not find the list.
         """
 
-        endpoint = f"{site_url}_api/web/lists/getbytitle('{list_name}')"
-        headers = {
-            "Accept": "application/json;odata=verbose",
-            "Content-Type": "application/json;odata=verbose",
-        }
+        def load_list_properties():
+            endpoint = f"{site_url}_api/web/lists/getbytitle('{list_name}')"
+            headers = {
+                "Accept": "application/json;odata=verbose",
+                "Content-Type": "application/json;odata=verbose",
+            }
 
-        response = session.get(endpoint, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        output = data.get("d", {}).get(property_name, None)
-        time.sleep(0.5)
+            response = session.get(endpoint, headers=headers)
+            if response.status_code == 404:
+                invalidate_metadata_cache(site_url, list_name)
+                raise ListNotFoundError(list_name)
+            response.raise_for_status()
+            data = json_loads(response.content)
+            return data.get("d", {})
+
+        output = get_cached_metadata(site_url, list_name, "list_properties", load_list_properties).get(property_name, None)
         return output
 
     @staticmethod
@@ -139,6 +201,7 @@ class ListOperations:
 
         Notes:
             - The data type is used to understand the structure and type of data stored in the list.
+            - It is read from the cached list properties, see `get_list_property`.
         """
 
         list_item_data_type = ListOperations.get_list_property(
@@ -152,7 +215,8 @@ class ListOperations:
 
     @staticmethod
     def get_list_items(
-        site_url: str, list_name: str, session: requests.Session
+        site_url: str, list_name: str, session: requests.Session, max_workers: int = 8, select_fields: list[str] = None, expand_attachments: bool = False,
+        modified_since: datetime = None,
     ) -> list[dict]:
         
         """
@@ -162,44 +226,209 @@ class ListOperations:
             - site_url (str): The base URL of the SharePoint site.
             - list_name (str): The name of the SharePoint list.
             - session (requests.Session): An authenticated session object for making requests.
+            - max_workers (int, optional): The maximum number of `Id` ranges fetched at the same time, default is 8.
+            - select_fields (list[str], optional): The internal names of the fields to retrieve, `Id` is always included. Defaults to every field of the items.
+            - expand_attachments (bool, optional): Whether the names of the attachments of every item are returned along with it, in `AttachmentFiles`, default is False.
+            - modified_since (datetime, optional): Only retrieve the items modified after this time, e.g. the start of the previous sync. A naive datetime is taken as UTC. Defaults to every item.
 
         Returns:
-            - list[dict]: A list of dictionaries where each dictionary represents a SharePoint list item.
+            - list[dict]: A list of dictionaries where each dictionary represents a SharePoint list item, ordered by `Id`.
 
         Example:
             items = ListOperations.get_list_items(site_url, list_name, session)
 
+            required_cols = ListOperations.get_required_columns(site_url, list_name, session)
+            items = ListOperations.get_list_items(
+                site_url, list_name, session,
+                select_fields=["Modified", "Attachments"] + [col["Internal Name"] for col in required_cols.values() if col],
+                expand_attachments=True,
+            )
+
         Notes:
             - The method retrieves all items from the specified list.
-            - The returned list includes metadata and actual data for each item.
+            - Selecting only the fields that are used keeps the pages several times smaller, every field of the items is returned otherwise.
+            - Expanding the attachments saves `get_simplified_list` one request per item with attachments.
+            - With `modified_since`, the `Modified` filter is combined with every `Id` range, so each request still scans at most `MAX_PAGE_SIZE` items and stays under the list view threshold.
+            - Items are requested with `odata=nometadata`, so they hold the field values only, without `__metadata`.
+            - SharePoint only returns the link to the next page along with the current one, so instead of following it, the list is partitioned on `Id` in ranges of `MAX_PAGE_SIZE` which are fetched in parallel by `get_items_by_id_range`, as `BaseList.get_list_items` does.
+            - Throttled requests (429/503) are retried by the retry adapter mounted on the session by `SharePointConnector`, which honours `Retry-After` and raises `requests.exceptions.RetryError` once its attempts are exhausted.
+            - A `ListNotFoundError` is raised if SharePoint does not find the list, instead of exiting the interpreter.
         """
 
-        headers = {"Accept": "application/json; odata=verbose"}
-        endpoint = f"{site_url}_api/web/lists/getbytitle('{list_name}')/items"
+        items_endpoint = f"{site_url}_api/web/lists/getbytitle('{list_name}')/items"
 
-        all_items = []
-        while endpoint:
-            response = session.get(endpoint, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if response.status_code == 200:
-                items = data.get("d", {}).get("results", [])
-                all_items.extend(items)
-
-                endpoint = data.get("d", {}).get("__next", None)
-            elif response.status_code == 404:
-                ListOperations.logger.critical("List not found! Please double check your list name.")
-                exit()
-            else:
-                ListOperations.logger.error("Something went wrong!")
-            time.sleep(2)
-        items_retrieved = len(all_items)
-        if items_retrieved > 0:
-            ListOperations.logger.success("Total %s items retrieved", items_retrieved)
-        else:
+        # only the first page is read, SharePoint still returns a next link with $top=1
+        last_item, _ = ListOperations.__results(ListOperations.__get_json(
+            f"{items_endpoint}?$select=Id&$orderby=Id desc&$top=1", session, list_name
+        ))
+        if not last_item:
             ListOperations.logger.success("No items in the list.")
+            return []
+        max_id = last_item[0]["Id"]
+
+        select_option = ListOperations.__select_option(select_fields, expand_attachments)
+        modified_filter = ""
+        if modified_since is not None:
+            if modified_since.tzinfo is not None:
+                modified_since = modified_since.astimezone(timezone.utc)
+            modified_filter = f" and Modified gt datetime'{modified_since:%Y-%m-%dT%H:%M:%SZ}'"
+        all_items = get_items_by_id_range(
+            max_id,
+            lambda lower, upper: list(ListOperations.__iter_pages(
+                f"{items_endpoint}?$filter=Id gt {lower} and Id le {upper}{modified_filter}&$top={MAX_PAGE_SIZE}{select_option}",
+                session,
+                list_name,
+            )),
+            max_workers,
+        )
+
+        ListOperations.logger.success("Total %s items retrieved", len(all_items))
         return all_items
+
+    @staticmethod
+    def iter_list_items(
+        site_url: str, list_name: str, session: requests.Session, select_fields: list[str] = None, expand_attachments: bool = False
+    ) -> Iterator[dict]:
+
+        """
+        Lazily retrieves the items of a SharePoint list, one page at a time.
+
+        Parameters:
+            - site_url (str): The base URL of the SharePoint site.
+            - list_name (str): The name of the SharePoint list.
+            - session (requests.Session): An authenticated session object for making requests.
+            - select_fields (list[str], optional): The internal names of the fields to retrieve, see `get_list_items`.
+            - expand_attachments (bool, optional): Whether the names of the attachments are returned along with the items, see `get_list_items`.
+
+        Yields:
+            - dict: A SharePoint list item, as soon as the page containing it has been fetched.
+
+        Example:
+            for item in ListOperations.iter_list_items(site_url, list_name, session):
+                ...
+
+        Notes:
+            - Only one page of `MAX_PAGE_SIZE` items is held in memory at a time, and the next page is not requested until the current one has been consumed. Prefer it over `get_list_items` for lists too large to be held in memory, at the cost of fetching the pages one after the other.
+        """
+
+        yield from ListOperations.__iter_pages(
+            f"{site_url}_api/web/lists/getbytitle('{list_name}')/items?$top={MAX_PAGE_SIZE}{ListOperations.__select_option(select_fields, expand_attachments)}",
+            session,
+            list_name,
+        )
+
+    @staticmethod
+    def __select_option(select_fields: list[str], expand_attachments: bool) -> str:
+
+        """
+        A private method that builds the `$select` and `$expand` options of an items query.
+
+        Parameters:
+            - select_fields (list[str] | None): The internal names of the fields to retrieve.
+            - expand_attachments (bool): Whether the `AttachmentFiles` of the items are expanded.
+
+        Returns:
+            - str: The `&$select=...` option, always including `Id`, followed by the `&$expand=AttachmentFiles` option if needed. An empty string retrieves every field without expansion.
+        """
+
+        option = ""
+        if select_fields:
+            if expand_attachments:
+                select_fields = [*select_fields, "AttachmentFiles/FileName"]
+            # Id first, duplicates removed while keeping the order of the fields
+            option = "&$select=" + ",".join(dict.fromkeys(["Id", *select_fields]))
+        if expand_attachments:
+            option += "&$expand=AttachmentFiles"
+        return option
+
+    @staticmethod
+    def __iter_pages(endpoint: str, session: requests.Session, list_name: str) -> Iterator[dict]:
+
+        """
+        A private method that yields the items of an items query, following the next links returned by SharePoint.
+
+        Parameters:
+            - endpoint (str): The URL of the first page of the query.
+            - session (requests.Session): An authenticated session object for making requests.
+            - list_name (str): The name of the SharePoint list, reported if it does not exist.
+
+        Yields:
+            - dict: The items of every page of the query.
+
+        Notes:
+            - Throttled requests (429/503) are retried by the retry adapter mounted on the session by `SharePointConnector`, which honours `Retry-After` and raises `requests.exceptions.RetryError` once its attempts are exhausted.
+        """
+
+        while endpoint:
+            items, endpoint = ListOperations.__results(ListOperations.__get_json(endpoint, session, list_name))
+            yield from items
+
+    @staticmethod
+    def __get_json(endpoint: str, session: requests.Session, list_name: str) -> dict:
+
+        """
+        A private method that sends a read request with `odata=nometadata` and returns the decoded response.
+
+        Parameters:
+            - endpoint (str): The URL to request.
+            - session (requests.Session): An authenticated session object for making requests.
+            - list_name (str): The name of the SharePoint list, reported if it does not exist.
+
+        Returns:
+            - dict: The decoded JSON response.
+
+        Notes:
+            - Servers without JSON light support reject `odata=nometadata` (406/415), the request is then sent again with `odata=verbose`. Use `__results` to read either shape.
+            - Throttled requests (429/503) are retried by the retry adapter mounted on the session by `SharePointConnector`, which honours `Retry-After` and raises `requests.exceptions.RetryError` once its attempts are exhausted.
+            - A `ListNotFoundError` is raised if SharePoint does not find the list, any other error status raises `requests.HTTPError`.
+        """
+
+        response = session.get(endpoint, headers={"Accept": ACCEPT_MIN})
+        if response.status_code in (406, 415):
+            response = session.get(endpoint, headers={"Accept": ACCEPT_VERBOSE})
+        if response.status_code == 404:
+            # the list was renamed or deleted, its cached columns no longer apply
+            invalidate_metadata_cache(list_name=list_name)
+            raise ListNotFoundError(list_name)
+        response.raise_for_status()
+        return json_loads(response.content)
+
+    @staticmethod
+    def __results(data: dict) -> tuple[list, str]:
+
+        """
+        A private method that reads the results of a collection response and the link to its next page.
+
+        Parameters:
+            - data (dict): A decoded response, either `odata=nometadata` or `odata=verbose`.
+
+        Returns:
+            - tuple[list, str]: The results, and the URL of the next page or None on the last page.
+        """
+
+        if "d" in data:
+            return data["d"].get("results", []), data["d"].get("__next")
+        return data.get("value", []), data.get("odata.nextLink") or data.get("@odata.nextLink")
     
+    @staticmethod
+    def refresh_schema(site_url: str = None, list_name: str = None) -> None:
+
+        """
+        Drops the cached list properties and columns, so that they are fetched again from SharePoint on next use.
+
+        Parameters:
+            - site_url (str, optional): Only drop the entries of this site. Defaults to every site.
+            - list_name (str, optional): Only drop the entries of this list. Defaults to every list.
+
+        Example:
+            ListOperations.refresh_schema(site_url, list_name)
+
+        Notes:
+            - Call this after adding, removing or renaming columns of a list during a run, for the change to be seen before `META_CACHE_TTL` expires. The cache is shared with `BaseList`, whose cached metadata is dropped as well.
+        """
+
+        invalidate_metadata_cache(site_url, list_name)
+
     @staticmethod
     def get_column_datatypes(site_url:str, list_name:str, session:requests.Session) -> dict:
 
@@ -223,17 +452,24 @@ class ListOperations:
         ```
         Notes:
             - The returned dictionary helps in understanding the data types of columns for data handling and validation.
+            - The result is cached per site and list for `META_CACHE_TTL` seconds, or until `refresh_schema` is called or SharePoint answers 404.
         """
 
-        required_cols = {}
+        return get_cached_metadata(
+            site_url, list_name, "column_datatypes",
+            lambda: ListOperations.__load_column_datatypes(site_url, list_name, session),
+        )
+
+    @staticmethod
+    def __load_column_datatypes(site_url: str, list_name: str, session: requests.Session) -> dict:
 
-        headers = {"Accept": "application/json; odata=verbose"}
-        endpoint = f"{site_url}_api/web/lists/getbytitle('{list_name}')/fields?$filter=Hidden eq false and ReadOnlyField eq false"
+        """
+        A private method that builds the result of `get_column_datatypes` from the fields of the list.
+        """
 
-        response = session.get(endpoint, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        columns_info = data.get("d", {}).get("results", [])
+        required_cols = {}
+
+        columns_info = ListOperations.__get_fields(site_url, list_name, session)
         for column in columns_info:
             title = column["Title"]
             internal_name = column["EntityPropertyName"]
@@ -245,7 +481,6 @@ class ListOperations:
                     "Internal Name": internal_name,
                     "Data Type": data_type,
                 }
-        time.sleep(0.5)
 
         return required_cols
 
@@ -286,7 +521,7 @@ class ListOperations:
         return data
 
     @staticmethod
-    def get_simplified_list(self, site_url, list_name, list_data, required_cols) -> list:
+    def get_simplified_list(site_url, list_name, list_data, required_cols, session: requests.Session = None) -> list:
 
         """
         Simplifies a list of SharePoint list items by including only the required columns.
@@ -296,6 +531,7 @@ class ListOperations:
             - list_name (str): The name of the SharePoint list.
             - list_data (list): A list of dictionaries where each dictionary represents a SharePoint list item.
             - required_cols (dict): A dictionary of required columns to include in the simplified list.
+            - session (requests.Session, optional): An authenticated session object, needed when `required_cols` includes "Attachment List".
 
         Returns:
             - list: A simplified list containing only the required columns for each item.
@@ -306,35 +542,57 @@ class ListOperations:
                 site_url,
                 list_name,
                 list_data,
-                required_cols={'Title': 'Title', 'Description': 'Description'}
+                required_cols={'Title': 'Title', 'Description': 'Description'},
+                session=session,
             )
             ```
         Notes:
             - The method filters out unnecessary columns and includes only those specified in `required_cols`.
             - Useful for reducing data complexity and focusing on relevant information.
+            - Rows read with `expand_attachments=True` already hold their attachment names. The attachments of the other rows are fetched `ATTACHMENT_WORKERS` at a time.
         """
 
-        items_list = []
-        for row in list_data:
-            list_item_dict = {}
-            column_display_names = list(required_cols.keys())
-            for col in column_display_names:
-                # adding Id
-                if col == "Id":
-                    row_id = row["Id"]
-                    list_item_dict["Id"] = row_id
-                # adding attachments
-                elif col == "Modified":
-                    list_item_dict["Modified"] = row["Modified"]
-                elif col == "Attachment List":
-                    attachemts = []
-                    if row["Attachments"]:
-                        attachemts = self.get_attachments(
-                            site_url=site_url, list_name=list_name, item_id=row_id
-                        )
-                        time.sleep(1)
-                    list_item_dict["Attachment List"] = attachemts
-                else:
-                    list_item_dict[col] = row[required_cols[col]["Internal Name"]]
-            items_list.append(list_item_dict)
-        return items_list
\ No newline at end of file
+        # resolved once for all rows: the source field of every column, None for the attachments
+        columns = []
+        for col in required_cols:
+            if col == "Attachment List":
+                columns.append((col, None))
+            elif col in ("Id", "Modified"):
+                columns.append((col, col))
+            else:
+                columns.append((col, required_cols[col]["Internal Name"]))
+
+        # attachment names are taken from the expanded rows, or fetched for all other rows concurrently, before the rows are built
+        attachments_by_id = {}
+        if "Attachment List" in required_cols:
+            for row in list_data:
+                if "AttachmentFiles" in row:
+                    attachment_files = row["AttachmentFiles"]
+                    # odata=verbose nests the expanded collection in "results"
+                    if isinstance(attachment_files, dict):
+                        attachment_files = attachment_files.get("results", [])
+                    attachments_by_id[row["Id"]] = [attachment["FileName"] for attachment in attachment_files]
+            ids_with_attachments = [
+                row["Id"] for row in list_data
+                if row["Id"] not in attachments_by_id and row["Attachments"]
+            ]
+            with ThreadPoolExecutor(max_workers=ATTACHMENT_WORKERS) as executor:
+                attachments_by_id.update(
+                    zip(
+                        ids_with_attachments,
+                        executor.map(
+                            lambda item_id: SharePointOperations.get_attachments(
+                                site_url, list_name, item_id, session
+                            ),
+                            ids_with_attachments,
+                        ),
+                    )
+                )
+
+        return [
+            {
+                col: row[source] if source is not None else attachments_by_id.get(row["Id"], [])
+                for col, source in columns
+            }
+            for row in list_data
+        ]
\ No newline at end of file
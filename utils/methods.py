@@ -1,9 +1,61 @@
 import os
 import shutil
 from datetime import datetime
+from functools import lru_cache
 from logger.custom_logger import get_logger
 from utils.tools import str_to_bool
 
+def _to_text(value):
+    """
+    Converts the value of a Text column to a string.
+    """
+
+    return value if isinstance(value, str) else str(value)
+
+def _to_number(value):
+    """
+    Converts the value of a Number column, keeping ints and floats as they are and parsing other values.
+    """
+
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+# columns copied by prepare_data as they are, without being mapped to an internal name
+_PASSTHROUGH_KEYS = frozenset({'Attachment List', 'Id', 'Attachments'})
+
+# columns that do not make get_list_diff update an item when they differ
+_IGNORE_COMPARE = frozenset({'Id', 'Modified'})
+
+# converters applied to the values of a column, by data type; other data types are passed as is
+_CONVERTERS = {
+    'Text': _to_text,
+    'Number': _to_number,
+}
+
+@lru_cache(maxsize=32)
+def _row_tuple_builder(keys):
+    """
+    Generates a function converting items with the given columns to the tuple format of `Utils.dict_to_tuple`,
+    with one inlined lookup per column instead of a loop over the items.
+
+    Args:
+        keys (tuple): The sorted columns of the items, without 'Id'.
+
+    Returns:
+        callable: The function converting an item to its tuple.
+    """
+
+    fields = "".join(
+        f"({key!r}, tuple(v) if isinstance(v := d[{key!r}], list) else v), " for key in keys
+    )
+    namespace = {}
+    exec(f"def row_tuple(d):\n    return ({fields})", namespace)
+    return namespace['row_tuple']
+
 class Utils:
     """
     A utility class providing various static methods for data transformation, list comparison, 
@@ -11,8 +63,10 @@ class Utils:
 
     Methods:
         dict_to_tuple(d): Converts a dictionary to a tuple.
-        prepare_data(item_dict, required_col_dict): Prepares and formats data for insertion based on column mappings.
-        get_list_diff(a, b, required_destination_cols, primary_key): Compares two lists and identifies items to insert and update.
+        compile_schema(required_col_dict): Resolves the internal name and converter of every column once.
+        prepare_data(item_dict, required_col_dict, schema=None): Prepares and formats data for insertion based on column mappings.
+        index_items(items, primary_key): Indexes a list of items by their primary key.
+        get_list_diff(a, b, required_destination_cols, primary_key, index_b=None): Compares two lists and identifies items to insert and update.
         compare_list_items(a, b): Compares two lists and returns their differences.
         clear_folder(folder_path): Clears all files in the specified folder.
     """
@@ -20,17 +74,25 @@ class Utils:
     logger = get_logger('Utils')
 
     @staticmethod
-    def dict_to_tuple(d):
+    def dict_to_tuple(d, keys=None):
         """
         Converts a dictionary to a tuple format.
 
         Args:
             d (dict): The dictionary to convert.
+            keys (list, optional): The sorted keys of the dictionary, without 'Id'. Pass them when converting many
+                dictionaries with the same keys, so they are not sorted again for each one.
 
         Returns:
             tuple: A tuple representation of the dictionary, where each item from the dictionary is converted accordingly.
         """
 
+        if keys is not None:
+            return tuple(
+                (key, tuple(d[key]) if isinstance(d[key], list) else d[key])
+                for key in keys
+            )
+
         list_dict = []
         for key, value in sorted(d.items()):
             if key != 'Id':
@@ -42,50 +104,74 @@ class Utils:
         return tuple(list_dict)
 
     @staticmethod
-    def prepare_data(item_dict, required_col_dict):
+    def compile_schema(required_col_dict):
+        """
+        Resolves the internal name and value converter of every column once, for `prepare_data`.
+
+        Args:
+            required_col_dict (dict): The dictionary defining the required columns and their mappings.
+
+        Returns:
+            dict: The internal name and converter of every column, keyed by column. The converter is None for data
+            types whose values are passed as is.
+        """
+
+        return {
+            key: (spec['Internal Name'], _CONVERTERS.get(spec.get('Data Type')))
+            for key, spec in required_col_dict.items()
+            if spec and 'Internal Name' in spec
+        }
+
+    @staticmethod
+    def prepare_data(item_dict, required_col_dict, schema=None):
         """
         Prepares data for insertion by mapping items from the given dictionary to required columns.
 
         Args:
             item_dict (dict): The dictionary containing item data.
             required_col_dict (dict): The dictionary defining the required columns and their mappings.
+            schema (dict, optional): The result of `compile_schema(required_col_dict)`, pass it when preparing many
+                items with the same columns. Compiled on each call otherwise.
 
         Returns:
             list: A list containing the prepared data for insertion based on the required columns.
         """
 
+        if schema is None:
+            schema = Utils.compile_schema(required_col_dict)
+
         insert_item = {}
         try:
             for key, value in item_dict.items():
-                if key in ('Attachment List', 'Id', 'Attachments'):
+                if key in _PASSTHROUGH_KEYS:
                     insert_item[key] = value
-                else:
-                    if value:
-                        if key not in ['Modified']:
-                            data_type = required_col_dict[key]['Data Type']
-                            internl_name = required_col_dict[key]['Internal Name']
-
-                            if data_type == 'Text':
-                                if not isinstance(value, str):
-                                    value = str(value)
-                            elif data_type == 'Number':
-                                if not isinstance(value, int) or not isinstance(value, float):
-                                    value = int(value)
-                            elif data_type == 'DateTime':
-                                pass
-                            elif data_type == 'Choice':
-                                pass
-                            elif data_type == 'Attachments':
-                                pass
-                            else:
-                                pass
-                            insert_item[internl_name] = value
+                elif value and key != 'Modified':
+                    internal_name, convert = schema[key]
+                    # Text values are stringified, Number values kept as int or float and parsed otherwise
+                    if convert is not None:
+                        value = convert(value)
+                    insert_item[internal_name] = value
         except Exception as e:
             print(e)
         return insert_item
 
     @staticmethod
-    def get_list_diff(a, b, required_destination_cols, primary_key = 'Requirement Id'):
+    def index_items(items, primary_key = 'Requirement Id'):
+        """
+        Indexes a list of dictionaries by their primary key, for `get_list_diff`.
+
+        Args:
+            items (list): The list of items to index.
+            primary_key (str, optional): The key identifying the items (default is 'Requirement Id').
+
+        Returns:
+            dict: The items keyed by their primary key.
+        """
+
+        return {item[primary_key]: item for item in items}
+
+    @staticmethod
+    def get_list_diff(a, b, required_destination_cols, primary_key = 'Requirement Id', index_b=None):
         """
         Compares two lists of dictionaries and determines items to insert and update based on a primary key.
 
@@ -94,6 +180,8 @@ class Utils:
             b (list): The list representing the destination data.
             required_destination_cols (list): A list of required destination columns for the comparison.
             primary_key (str, optional): The primary key to match between the two lists (default is 'Requirement Id').
+            index_b (dict, optional): The result of `index_items(b, primary_key)`, pass it when comparing several
+                lists against the same destination data. Built on each call otherwise.
 
         Returns:
             tuple: 
@@ -102,47 +190,45 @@ class Utils:
         """
 
         # required_destination_cols['Requirement Id']['Internal Name']
-        dict_b = {item[primary_key]: item for item in b}
-        inserts = []
-        updates = []
-        for item_a in a:
-            if item_a.get("Customer Name") and 'kpmg' in item_a['Customer Name'].lower():
-                title = item_a[primary_key]
-                if title not in dict_b:
-                    insert_data = {}
-                    insert_data = Utils.prepare_data(item_a, required_destination_cols)
-                    insert_data.update(Utils.prepare_data({'Update Flag': 'True'}, required_destination_cols))
-                    inserts.append(insert_data)
-                else:
-                    update_flag = str_to_bool(dict_b[title]['Update Flag'])
-                    if update_flag:
-                        item_b = dict_b[title]
-                        modified_a = datetime.fromisoformat(item_a['Modified'])
-                        modified_b = datetime.fromisoformat(item_b['Modified'])
-
-                        need_update = False
-                        if modified_a > modified_b:
-                            for key in item_a:
-                                if key not in ['Id', 'Modified'] and item_a[key] != item_b.get(key):
-                                    need_update = True
-                                    break
-                        
-                        if need_update:
-                            update_data = {}
-                            update_data = Utils.prepare_data(item_a, required_destination_cols)
-                            updates.append(update_data)
-            
-            if len(inserts) + len(b) > len(a):
-                #some items has been deleted in list a
-                dict_a = {item[primary_key]: item for item in a}
-                for item_b in b:
-                    title = item_b[primary_key]
-                    if title not in dict_a:
-                        update_data = {}
-                        item_b['Current Status'] = 'Closed'
-                        update_data = Utils.prepare_data(item_b, required_destination_cols)
-                        updates.append(update_data)
-                    
+        dict_b = index_b if index_b is not None else Utils.index_items(b, primary_key)
+        schema = Utils.compile_schema(required_destination_cols)
+        candidates = [
+            item_a for item_a in a
+            if item_a.get("Customer Name") and 'kpmg' in item_a['Customer Name'].lower()
+        ]
+
+        # the same for every inserted item, so it is prepared once
+        update_flag_data = Utils.prepare_data({'Update Flag': 'True'}, required_destination_cols, schema)
+        inserts = [
+            {**Utils.prepare_data(item_a, required_destination_cols, schema), **update_flag_data}
+            for item_a in candidates
+            if item_a[primary_key] not in dict_b
+        ]
+
+        flagged = [
+            (item_a, dict_b[item_a[primary_key]]) for item_a in candidates
+            if item_a[primary_key] in dict_b and str_to_bool(dict_b[item_a[primary_key]]['Update Flag'])
+        ]
+        updates = [
+            Utils.prepare_data(item_a, required_destination_cols, schema)
+            for item_a, item_b in flagged
+            if datetime.fromisoformat(item_a['Modified']) > datetime.fromisoformat(item_b['Modified'])
+            and any(key not in _IGNORE_COMPARE and item_a[key] != item_b.get(key) for key in item_a)
+        ]
+
+        # checked once all of a is matched, so every deleted item is closed exactly once
+        # an empty source is more likely a failed read or an empty sheet than a deleted list, so nothing is closed then
+        if a and len(inserts) + len(b) > len(a):
+            #some items has been deleted in list a
+            keys_a = {item[primary_key] for item in a}
+            for item_b in b:
+                title = item_b[primary_key]
+                if title not in keys_a:
+                    update_data = {}
+                    item_b['Current Status'] = 'Closed'
+                    update_data = Utils.prepare_data(item_b, required_destination_cols, schema)
+                    updates.append(update_data)
+
         return inserts, updates
 
     @staticmethod
@@ -158,11 +244,22 @@ class Utils:
             list: The items that are different between the two lists.
         """
 
-        set_a = set(Utils.dict_to_tuple(d) for d in a)
-        set_b = set(Utils.dict_to_tuple(d) for d in b)
+        sample = a[0] if a else b[0] if b else {}
+        fields = sample.keys()
+        # the columns are the same for every item of a sync, so they are sorted once
+        keys = sorted(key for key in fields if key != 'Id')
+
+        build = _row_tuple_builder(tuple(keys))
+
+        def row_tuple(d):
+            # items with other columns fall back to sorting their own keys
+            if d.keys() == fields:
+                return build(d)
+            return Utils.dict_to_tuple(d)
 
-        set_only_a = set_a - set_b
-        difference = [d for d in a if Utils.dict_to_tuple(d) in set_only_a]
+        # every item of a is converted once, and checked against b directly
+        set_b = {row_tuple(d) for d in b}
+        difference = [d for d in a if row_tuple(d) not in set_b]
         return difference
 
     @staticmethod
@@ -177,12 +274,13 @@ class Utils:
             - Deletes all files in the specified folder.
         """
 
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-            except Exception as e:
-                print(f"Failed to delete {file_path}. {e}")
+        # DirEntry reuses the file type read with the directory listing, instead of one stat() per check
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() or entry.is_symlink():
+                        os.unlink(entry.path)
+                    elif entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                except Exception as e:
+                    print(f"Failed to delete {entry.path}. {e}")
@@ -0,0 +1,55 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """
+    Parses a JSON document, using `orjson` when it is installed and the standard library otherwise.
+
+    Args:
+        data (bytes or str): The JSON document, typically `response.content`.
+
+    Returns:
+        object: The parsed JSON value.
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj) -> str:
+    """
+    Serializes a value to a compact JSON string, using `orjson` when it is installed and the standard library otherwise.
+
+    Args:
+        obj (object): The value to serialize, typically the payload of a write operation.
+
+    Returns:
+        str: The JSON document.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    # same output as orjson: no whitespace, non-ASCII characters kept as is
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def json_dumpb(obj) -> bytes:
+    """
+    Serializes a value to a compact, UTF-8 encoded JSON document, see `json_dumps`.
+
+    Args:
+        obj (object): The value to serialize, typically the payload of a write operation.
+
+    Returns:
+        bytes: The encoded JSON document, `orjson` output is returned without a decode/encode round trip.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -1,4 +1,7 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 class TaskManager:
     """
@@ -6,25 +9,39 @@ class TaskManager:
 
     Attributes:
         executor (ThreadPoolExecutor): The thread pool executor used to submit tasks.
-        futures (list): A list to track the futures representing the tasks.
+        max_workers (int): The number of threads of the pool.
 
     Methods:
         add_task(func, *args, **kwargs): Adds a task to the executor for concurrent execution.
         get_results(): Collects and returns the results of all completed tasks.
+        map_results(fn): Passes the result of every task to a function as soon as the task completes.
         shutdown(): Shuts down the thread pool executor.
     """
 
-    def __init__(self):
+    def __init__(self, max_workers=None, max_pending=None):
         """
-        Initializes the TaskManager instance with a thread pool executor and an empty list of futures.
+        Initializes the TaskManager instance with a bounded thread pool executor.
+
+        Args:
+            max_workers (int, optional): The number of threads of the pool. Defaults to `min(32, 4 * cpu count)`,
+                since the tasks mostly wait on the network.
+            max_pending (int, optional): The number of submitted tasks not yet finished after which `add_task`
+                blocks until one finishes. Defaults to `2 * max_workers`.
         """
 
-        self.executor = ThreadPoolExecutor()
-        self.futures = []
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # bounds the executor queue, so producers can not outrun the workers
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * self.max_workers)
+        # results of the finished tasks, kept until get_results drains them; the futures themselves are not kept
+        self._results = deque()
+        self._pending = 0
+        self._done = threading.Condition()
 
     def add_task(self, func, *args, **kwargs):
         """
-        Adds a task to the thread pool executor for concurrent execution.
+        Adds a task to the thread pool executor for concurrent execution. Blocks while `max_pending` tasks are
+        still running or queued.
 
         Args:
             func (callable): The function to be executed concurrently.
@@ -35,28 +52,76 @@ class TaskManager:
             concurrent.futures.Future: A future object representing the task's execution.
         """
 
-        future = self.executor.submit(func, *args, **kwargs)
-        self.futures.append(future)
-        return future
+        self._slots.acquire()
+        with self._done:
+            self._pending += 1
+        try:
+            return self.executor.submit(self.__run, func, args, kwargs)
+        except BaseException:
+            self.__finish()
+            raise
+
+    def __run(self, func, args, kwargs):
+        """
+        Runs a task and records its result, or the exception it raised, before its future completes.
+        """
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._results.append(e)
+            raise
+        else:
+            self._results.append(result)
+            return result
+        finally:
+            self.__finish()
+
+    def __finish(self):
+        """
+        Releases the slot of a finished task and wakes up `map_results`, and `get_results` once no task is left.
+        """
+
+        self._slots.release()
+        with self._done:
+            self._pending -= 1
+            self._done.notify_all()
 
     def get_results(self):
         """
-        Collects and returns the results of all completed tasks.
+        Waits for the submitted tasks, then collects and returns the results of all completed tasks.
 
         Returns:
-            list: A list containing the results of all completed tasks. If a task raises an exception,
-            the exception is included in the list.
+            list: A list containing the results of all tasks completed since the last call, in completion order.
+            If a task raises an exception, the exception is included in the list.
         """
 
+        with self._done:
+            self._done.wait_for(lambda: self._pending == 0)
         results = []
-        for future in as_completed(self.futures):
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                results.append(e)
+        while self._results:
+            results.append(self._results.popleft())
         return results
 
+    def map_results(self, fn):
+        """
+        Passes the result of every task to a function as soon as the task completes, until no task is left.
+        Prefer it over `get_results` for large syncs: results are processed while other tasks are still running,
+        and released once processed rather than all kept until the end.
+
+        Args:
+            fn (callable): The function called with each result, in completion order, from the calling thread.
+                If a task raises an exception, the function is called with the exception.
+        """
+
+        while True:
+            with self._done:
+                self._done.wait_for(lambda: self._results or self._pending == 0)
+                if not self._results:
+                    return
+                result = self._results.popleft()
+            fn(result)
+
     def shutdown(self):
         """
         Shuts down the thread pool executor and waits for all tasks to complete.
@@ -1,10 +1,13 @@
 import configparser
 import ast
-from rapidfuzz import process
+import json
+from functools import lru_cache
+from rapidfuzz import fuzz, process
 
 def read_config(file_path):
     """
-    Reads a configuration file and returns a ConfigParser object.
+    Reads a configuration file and returns a ConfigParser object. All values are normalized to lists of mappings
+    once here, so that `write_config` can write the configuration as is.
 
     Args:
         file_path (str): The path to the configuration file.
@@ -15,35 +18,53 @@ def read_config(file_path):
 
     config = configparser.ConfigParser()
     config.read(file_path)
+    normalize_config(config)
     return config
 
-def write_config(config, file_path):
+def normalize_config(config):
     """
-    Writes the configuration data to a file. Ensures that all mappings are stored as lists.
+    Ensures that all mappings of a configuration are stored as lists.
 
     Args:
-        config (configparser.ConfigParser): The configuration parser object to be written.
-        file_path (str): The path to the file where the configuration will be written.
+        config (configparser.ConfigParser): The configuration parser object to normalize.
 
     Actions:
         - Converts the configuration values to lists if they are not already in list format.
-        - Writes the modified configuration to the specified file.
+        - Stores the lists as JSON, which `get_mappings` parses faster than Python literals.
+        - Leaves values holding a stray '%' (e.g. `d = 50%`) as they are, since `config.set` rejects them.
     """
 
-    # Ensure that mappings are stored as lists
     for section in config.sections():
         for option in config.options(section):
-            value = config.get(section, option)
+            # raw, so a stray '%' does not fail the interpolation while the file is loaded
+            value = config.get(section, option, raw=True)
             try:
                 # Convert value to a list if it's not already
-                value_list = ast.literal_eval(value)
+                value_list = _load_literal(value)
                 if not isinstance(value_list, list):
                     raise ValueError
-                config.set(section, option, str(value_list))
             except (ValueError, SyntaxError):
                 # If value is not a list, wrap it in a list
-                config.set(section, option, str([value]))
-    
+                value_list = [value]
+            try:
+                store_mappings(config, section, option, value_list)
+            except ValueError:
+                # invalid interpolation syntax, the value is kept as written in the file
+                pass
+
+def write_config(config, file_path):
+    """
+    Writes the configuration data to a file.
+
+    Args:
+        config (configparser.ConfigParser): The configuration parser object to be written.
+        file_path (str): The path to the file where the configuration will be written.
+
+    Notes:
+        - Values are written as they are. They are kept as lists by `read_config`, `set_mappings` and
+          `store_mappings`, so a value set with `config.set` directly should go through `normalize_config` first.
+    """
+
     with open(file_path, 'w') as configfile:
         config.write(configfile)
 
@@ -63,10 +84,37 @@ def get_mappings(config, section, option):
 
     try:
         value = config.get(section, option, fallback="[]")
-        return ast.literal_eval(value)
+    except configparser.InterpolationError:
+        # a stray '%' left as written by normalize_config
+        value = config.get(section, option, raw=True)
+    parsed = _parse_mappings(value)
+    if isinstance(parsed, tuple):
+        # a fresh list, callers such as set_mappings extend the list they get
+        return list(parsed)
+    return parsed
+
+@lru_cache(maxsize=256)
+def _parse_mappings(value):
+    """
+    Parses the raw value of a mappings option. The result is cached per raw value, so an option changed
+    with `config.set` is parsed again while unchanged options are parsed only once.
+
+    Args:
+        value (str): The raw value of the option, e.g. '["Title", "Name"]'.
+
+    Returns:
+        tuple or object: The parsed values as a tuple, so that the cached value can not be modified, or the parsed
+        value as is when it is not a list. Returns an empty tuple in case of improper formatting.
+    """
+
+    try:
+        parsed = _load_literal(value)
     except (SyntaxError, ValueError):
         # In case of improper formatting, return an empty list
-        return []
+        return ()
+    if isinstance(parsed, list):
+        return tuple(parsed)
+    return parsed
 
 def set_mappings(config, section, option, new_value):
     """
@@ -86,8 +134,59 @@ def set_mappings(config, section, option, new_value):
     current_mappings = get_mappings(config, section, option)
     if new_value not in current_mappings and new_value != '':
         current_mappings.append(new_value)
-    config.set(section, option, str(current_mappings))
+    store_mappings(config, section, option, current_mappings)
+
+def store_mappings(config, section, option, value_list):
+    """
+    Replaces the list of mappings of an option.
+
+    Args:
+        config (configparser.ConfigParser): The configuration parser object.
+        section (str): The section in the configuration file.
+        option (str): The option under the section whose value is to be replaced.
+        value_list (list): The new list of mappings.
+
+    Actions:
+        - Updates the configuration object with the list of mappings, stored as JSON.
+    """
+
+    config.set(section, option, _dump_mappings(value_list))
 
+def _load_literal(value):
+    """
+    Parses a raw configuration value, written as JSON by `store_mappings`, or as a Python literal by older versions.
+    A ValueError or SyntaxError is raised if the value is neither.
+
+    Args:
+        value (str): The raw value of the option.
+
+    Returns:
+        object: The parsed value.
+    """
+
+    try:
+        return json.loads(value)
+    except ValueError:
+        # files written before the switch to JSON hold Python literals, e.g. ['Title'] with single quotes
+        return ast.literal_eval(value)
+
+def _dump_mappings(value_list):
+    """
+    Serializes a list of mappings for the configuration file.
+
+    Args:
+        value_list (list): The mappings to store.
+
+    Returns:
+        str: The JSON representation of the list.
+    """
+
+    return json.dumps(value_list, ensure_ascii=False)
+
+# strings read as True by str_to_bool, in lower case
+_TRUE_STRINGS = frozenset({'true', '1', 'yes', 'y'})
+
+@lru_cache(maxsize=32)
 def str_to_bool(string_value):
     """
     Converts a string representation of a boolean to a boolean value.
@@ -97,10 +196,13 @@ def str_to_bool(string_value):
 
     Returns:
         bool: The corresponding boolean value. Returns True for 'true', '1', 'yes', 'y' (case-insensitive),
-        and False otherwise.
+        and False otherwise. Values that are not strings, such as a missing environment variable, are
+        converted with `bool`.
     """
 
-    return string_value.lower() in ['true', '1', 'yes', 'y']
+    if not isinstance(string_value, str):
+        return bool(string_value)
+    return string_value.lower() in _TRUE_STRINGS
 
 def map_skill(user_input, predefined_skills, threshold=80):
     """
@@ -114,13 +216,40 @@ def map_skill(user_input, predefined_skills, threshold=80):
     Returns:
         str or None: The best matching skill if the score exceeds the threshold; otherwise, returns None.
     """
-    
-    best_match, score = process.extractOne(
-        user_input,
+
+    return map_skills([user_input], predefined_skills, threshold)[0]
+
+def map_skills(user_inputs, predefined_skills, threshold=80):
+    """
+    Matches many user input skills to a predefined skill list at once using fuzzy matching.
+
+    Args:
+        user_inputs (list): The skill inputs provided by the user.
+        predefined_skills (list): A list of predefined skills to match against.
+        threshold (int, optional): The matching threshold score (default is 80).
+
+    Returns:
+        list: The best matching skill for every input, or None where no score exceeds the threshold.
+
+    Actions:
+        - Scores every input against every predefined skill in one `cdist` call, spread over all cores, instead of
+          preparing the predefined skills again for every input.
+    """
+
+    if not user_inputs or not predefined_skills:
+        return [None] * len(user_inputs)
+
+    scores = process.cdist(
+        user_inputs,
         predefined_skills,
-        score_cutoff=threshold
+        scorer=fuzz.WRatio,
+        score_cutoff=threshold,
+        workers=-1
     )
 
-    if best_match:
-        return best_match
-    return None
\ No newline at end of file
+    matches = []
+    for row in scores:
+        # scores under the threshold are returned as 0
+        best = int(row.argmax())
+        matches.append(predefined_skills[best] if row[best] else None)
+    return matches